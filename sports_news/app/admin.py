@@ -0,0 +1,11 @@
+from django.contrib import admin
+from app.models import LLMCall, PostJob
+
+admin.site.register(LLMCall)
+
+@admin.register(PostJob)
+class PostJobAdmin(admin.ModelAdmin):
+    list_display = ("title", "item_type", "item_id", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status", "item_type")
+    ordering = ("-created_at",)
+    show_full_result_count = False
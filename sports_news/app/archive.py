@@ -0,0 +1,191 @@
+from app.models import ArchivedItem
+from app.post_queue import ITEM_MODELS
+from django.conf import settings
+from django.core import serializers
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
+import time
+
+# The field the scrapers dedupe each item type on
+DEDUPE_FIELDS = {"article": "link", "video": "vid_id"}
+
+# Only items the pipeline is done with are archived
+FINAL_STATUSES = ("posted", "failed")
+
+def key_hash(key):
+    """A short, fixed-size hash of a link or YouTube id."""
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+def is_archived(item_type, key):
+    """Whether an item with this link or YouTube id was scraped before and archived since."""
+    return ArchivedItem.objects.filter(item_type=item_type, key_hash=key_hash(key)).exists()
+
+class Archiver:
+    """
+    A class to move old articles and videos into ArchivedItem and back.
+
+    Items are archived in small batches, each in its own short transaction, so
+    the retention job never holds locks on many rows or for long.
+    """
+
+    def __init__(self, days=None, batch_size=None, pause=None, logger=None):
+        """
+        Initialize the archiver.
+
+        Args:
+            days: Archive items scraped more than this many days ago (ARCHIVE_AFTER_DAYS).
+            batch_size: Items archived per transaction (ARCHIVE_BATCH_SIZE).
+            pause: Seconds to sleep between batches (ARCHIVE_BATCH_PAUSE).
+            logger: A callable object with methods for logging (info, error, etc.)
+                   If None, print statements will be used.
+        """
+        self.days = days if days is not None else getattr(settings, 'ARCHIVE_AFTER_DAYS', 90)
+        self.batch_size = batch_size or getattr(settings, 'ARCHIVE_BATCH_SIZE', 500)
+        self.pause = pause if pause is not None else getattr(settings, 'ARCHIVE_BATCH_PAUSE', 0.1)
+        self.logger = logger
+
+    def log_info(self, message):
+        """Log an informational message."""
+        if self.logger:
+            self.logger.info(message)
+        else:
+            print(message)
+
+    def log_error(self, message):
+        """Log an error message."""
+        if self.logger:
+            self.logger.error(message)
+        else:
+            print(f"ERROR: {message}")
+
+    def candidates(self, item_type):
+        """Items older than the retention window that are no longer in the pipeline."""
+        cutoff = timezone.now() - timedelta(days=self.days)
+        return ITEM_MODELS[item_type].objects.filter(timestamp__lt=cutoff, status__in=FINAL_STATUSES)
+
+    def archive_old(self, item_types=None, max_batches=None):
+        """
+        Archive every item older than the retention window, batch by batch.
+
+        Args:
+            item_types: Item types to archive, all by default.
+            max_batches: Stop after this many batches per type (ARCHIVE_MAX_BATCHES);
+                         the rest is left for the next run.
+
+        Returns:
+            Dict with the items archived per type, the number of batches and the
+            compressed size of the archived rows.
+        """
+        max_batches = max_batches or getattr(settings, 'ARCHIVE_MAX_BATCHES', 200)
+        report = {"archived": {}, "batches": 0, "bytes": 0, "raw_bytes": 0}
+        start_time = time.perf_counter()
+
+        for item_type in item_types or ITEM_MODELS:
+            report["archived"][item_type] = 0
+            for _ in range(max_batches):
+                count, raw_bytes, stored_bytes = self.archive_batch(item_type)
+                if not count:
+                    break
+                report["archived"][item_type] += count
+                report["batches"] += 1
+                report["raw_bytes"] += raw_bytes
+                report["bytes"] += stored_bytes
+                time.sleep(self.pause)
+
+        report["seconds"] = round(time.perf_counter() - start_time, 3)
+        self.log_info(
+            f"Archived {report['archived']} in {report['batches']} batches, "
+            f"{report['raw_bytes']} bytes compressed to {report['bytes']}"
+        )
+        return report
+
+    def archive_batch(self, item_type):
+        """
+        Move up to batch_size of the oldest candidates into ArchivedItem.
+
+        Returns:
+            tuple: (items archived, serialized bytes, compressed bytes)
+        """
+        import zstandard
+
+        model = ITEM_MODELS[item_type]
+        dedupe_field = DEDUPE_FIELDS[item_type]
+        ids = list(self.candidates(item_type).order_by("timestamp").values_list("id", flat=True)[:self.batch_size])
+        if not ids:
+            return 0, 0, 0
+
+        compressor = zstandard.ZstdCompressor(level=10)
+        with transaction.atomic():
+            # Rows locked by a running task are left for the next batch rather than waited on
+            items = list(model.objects.select_for_update(skip_locked=True).filter(id__in=ids, status__in=FINAL_STATUSES))
+            rows = []
+            raw_bytes = 0
+            for item in items:
+                data = serializers.serialize("json", [item]).encode()
+                raw_bytes += len(data)
+                rows.append(ArchivedItem(
+                    item_type=item_type,
+                    item_id=item.id,
+                    key_hash=key_hash(getattr(item, dedupe_field)),
+                    timestamp=item.timestamp,
+                    data=compressor.compress(data),
+                ))
+            ArchivedItem.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["item_type", "key_hash"],
+                update_fields=["item_id", "timestamp", "data"],
+            )
+            model.objects.filter(id__in=[item.id for item in items]).delete()
+        return len(items), raw_bytes, sum(len(row.data) for row in rows)
+
+    def restore(self, item_type, ids=None, keys=None, since=None):
+        """
+        Move archived items back into their table.
+
+        Args:
+            item_type: "article" or "video"
+            ids: Restore these item ids.
+            keys: Restore the items with these links or YouTube ids.
+            since: Restore the items scraped at or after this datetime.
+
+        Returns:
+            Dict with counts of restored and skipped items; an item is skipped if
+            it was scraped again since it was archived.
+        """
+        import zstandard
+
+        model = ITEM_MODELS[item_type]
+        # Items matching any of the filters are restored
+        selected = Q(pk__in=[])
+        if ids:
+            selected |= Q(item_id__in=ids)
+        if keys:
+            selected |= Q(key_hash__in=[key_hash(key) for key in keys])
+        if since:
+            selected |= Q(timestamp__gte=since)
+        archived = ArchivedItem.objects.filter(selected, item_type=item_type)
+
+        decompressor = zstandard.ZstdDecompressor()
+        report = {"restored": 0, "skipped": 0}
+        for row in archived.iterator():
+            with transaction.atomic():
+                deserialized = next(serializers.deserialize(
+                    "json", decompressor.decompress(row.data), ignorenonexistent=True
+                ))
+                item = deserialized.object
+                dedupe_field = DEDUPE_FIELDS[item_type]
+                existing = model.objects.filter(id=item.id) | model.objects.filter(**{dedupe_field: getattr(item, dedupe_field)})
+                if existing.exists():
+                    self.log_error(f"{item_type} {item.id} was scraped again since it was archived, keeping the archived copy")
+                    report["skipped"] += 1
+                    continue
+                deserialized.save()
+                row.delete()
+            report["restored"] += 1
+
+        self.log_info(f"Restored {report['restored']} {item_type}s, skipped {report['skipped']}")
+        return report
@@ -0,0 +1,123 @@
+from app.utils import llm as llm
+from django.db.models import Q
+from django.utils import timezone
+from news.models import Article
+from highlights.models import Video
+
+class PostGenerator:
+    """
+    A class to generate post text for newly scraped articles and videos ahead of upload.
+    This runs as a background stage after scraping so the upload step usually only posts.
+    """
+
+    def __init__(self, logger=None):
+        """
+        Initialize the generator.
+
+        Args:
+            logger: A callable object with methods for logging (info, error, etc.)
+                   If None, print statements will be used.
+        """
+        self.logger = logger
+        self.last_routing = None
+
+    def log_info(self, message):
+        """Log an informational message."""
+        if self.logger:
+            self.logger.info(message)
+        else:
+            print(message)
+
+    def log_error(self, message):
+        """Log an error message."""
+        if self.logger:
+            self.logger.error(message)
+        else:
+            print(f"ERROR: {message}")
+
+    def generate_pending(self, article_ids=None, video_ids=None):
+        """
+        Generate text for new items that don't have any yet.
+
+        Args:
+            article_ids: Optional list of Article ids to restrict generation to.
+            video_ids: Optional list of Video ids to restrict generation to.
+
+        Returns:
+            Dict with counts of generated and failed items and per-item latency.
+        """
+        # Items an upload has leased are generated by their own chain
+        unleased = Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=timezone.now())
+        articles = Article.objects.filter(unleased, status="scraped", generated_text="").order_by("-priority")
+        videos = Video.objects.filter(unleased, status="scraped", generated_text="").order_by("-priority")
+        if article_ids is not None:
+            articles = articles.filter(id__in=article_ids)
+        if video_ids is not None:
+            videos = videos.filter(id__in=video_ids)
+
+        report = {"articles_generated": 0, "videos_generated": 0, "failed": 0, "items": []}
+
+        for article in articles:
+            if self.generate_item(article):
+                report["articles_generated"] += 1
+            else:
+                report["failed"] += 1
+            report["items"].append(self._item_report("article", article))
+
+        for video in videos:
+            if self.generate_item(video, highlight=True):
+                report["videos_generated"] += 1
+            else:
+                report["failed"] += 1
+            report["items"].append(self._item_report("video", video))
+
+        self.log_info(
+            f"Pre-generated {report['articles_generated']} articles and "
+            f"{report['videos_generated']} videos ({report['failed']} failed)"
+        )
+        report["backend_health"] = llm.get_router().health()
+        return report
+
+    def generate_item(self, item, highlight: bool = False):
+        """
+        Generate and store post text for a single Article or Video.
+
+        Returns:
+            bool: True if text was generated and saved.
+        """
+        self.last_routing = None
+        try:
+            result = llm.generate(item.title, item.description, highlight=highlight)
+        except Exception as e:
+            self.log_error(f"Error generating text for '{item.title}': {e}")
+            return False
+        self.last_routing = result["routing"]
+
+        if not result["text"]:
+            self.log_error(f"No text generated for '{item.title}'")
+            return False
+
+        item.generated_text = result["text"]
+        item.generated_model = result["model"]
+        item.generation_latency = result["latency"]
+        item.generated_at = timezone.now()
+        # The uploader may have queued the item meanwhile, don't move it back to generated
+        type(item).objects.filter(id=item.id, status="scraped").update(
+            generated_text=item.generated_text,
+            generated_model=item.generated_model,
+            generation_latency=item.generation_latency,
+            generated_at=item.generated_at,
+            status="generated",
+        )
+
+        self.log_info(f"Generated text for '{item.title}' with {result['backend']} in {result['latency']:.2f} seconds")
+        return True
+
+    def _item_report(self, item_type, item):
+        return {
+            "type": item_type,
+            "id": item.id,
+            "model": item.generated_model,
+            "latency": item.generation_latency,
+            "routing": self.last_routing,
+        }
@@ -0,0 +1,37 @@
+# app/management/commands/archive_items.py
+from django.core.management.base import BaseCommand
+from app.archive import Archiver
+from app.post_queue import ITEM_MODELS
+
+class Command(BaseCommand):
+    help = "Moves posted and failed articles and videos older than the retention window into the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(ITEM_MODELS), help='Only archive this item type')
+        parser.add_argument('--days', type=int, help='Archive items scraped more than this many days ago (default: ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, help='Items per transaction (default: ARCHIVE_BATCH_SIZE)')
+        parser.add_argument('--max-batches', type=int, help='Batches per type before stopping (default: ARCHIVE_MAX_BATCHES)')
+        parser.add_argument('--dry-run', action='store_true', help='Count the items without archiving them')
+
+    def handle(self, *args, **options):
+        archiver = Archiver(days=options['days'], batch_size=options['batch_size'], logger=CommandLogger(self))
+        item_types = [options['type']] if options['type'] else list(ITEM_MODELS)
+
+        if options['dry_run']:
+            for item_type in item_types:
+                count = archiver.candidates(item_type).count()
+                self.stdout.write(f"{count} {item_type}s older than {archiver.days} days would be archived")
+            return
+
+        archiver.archive_old(item_types=item_types, max_batches=options['max_batches'])
+
+class CommandLogger:
+    """Logger adapter for Django commands that uses Django's stdout/stderr"""
+    def __init__(self, command):
+        self.command = command
+
+    def info(self, message):
+        self.command.stdout.write(self.command.style.SUCCESS(message))
+
+    def error(self, message):
+        self.command.stdout.write(self.command.style.ERROR(message))
@@ -0,0 +1,133 @@
+# app/management/commands/benchmark_llm.py
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from app.utils.fake_llm import FakeLLMServer
+from app.utils import llm as llm
+import statistics
+import json
+import time
+import os
+
+# Sample inputs for the generation path: (title, description, highlight)
+CORPUS = [
+    ("Oilers sign McDavid to eight-year contract extension",
+     "Connor McDavid signed an eight-year, $100 million contract extension with the Edmonton Oilers on Tuesday.", False),
+    ("Matthews out week to week with upper-body injury",
+     "Auston Matthews will miss at least a week for the Toronto Maple Leafs after sustaining an upper-body injury.", False),
+    ("Panthers clinch playoff berth with win against Lightning",
+     "The Florida Panthers clinched a spot in the Stanley Cup Playoffs with a 4-2 win against the Tampa Bay Lightning.", False),
+    ("Ovechkin scores 895th goal, passes Gretzky for NHL record",
+     "Alex Ovechkin became the NHL's all-time leading goal scorer for the Washington Capitals on Sunday.", False),
+    ("Kraken host Canucks seeking third straight win",
+     "The Seattle Kraken face the Vancouver Canucks tonight as they aim for a third consecutive victory.", False),
+    ("NHL Global Series returns to Europe next season",
+     "The NHL announced the Global Series will feature regular-season games in Stockholm and Helsinki.", False),
+    ("NHL Highlights | Bruins vs. Maple Leafs - March 8, 2025",
+     "Bruins beat the Leafs 4-2 as Pastrnak scored twice and Swayman made 31 saves.", True),
+    ("NHL Highlights | Avalanche vs. Stars - March 9, 2025",
+     "MacKinnon had a goal and two assists as the Avalanche defeated the Stars 5-3.", True),
+    ("NHL Highlights | Rangers vs. Devils - March 10, 2025",
+     "Hughes scored in overtime and the Devils edged the Rangers 3-2.", True),
+    ("NHL Highlights | Kings vs. Sharks - March 11, 2025",
+     "Kopitar reached 1,200 points and Kuemper stopped 28 shots in a 2-0 shutout.", True),
+]
+
+TARGETS = {
+    "send_request": lambda title, desc, highlight: llm.send_request(title, desc, highlight=highlight),
+    "send_request_langchain": llm.send_request_langchain,
+    "send_request_direct": llm.send_request_direct,
+    "send_api_request": llm.send_api_request,
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the LLM generation path against a local fake Ollama/OpenAI-compatible server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', choices=sorted(TARGETS),
+                            help='Function to benchmark (repeatable, default: send_request, send_request_direct, send_api_request)')
+        parser.add_argument('--tokens-per-sec', type=float, default=50.0, help='Generation speed of the fake model')
+        parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of fake requests that fail (0-1)')
+        parser.add_argument('--prompt-delay', type=float, default=0.2, help='Seconds before the first token')
+        parser.add_argument('--completion-tokens', type=int, default=40, help='Tokens generated per request')
+        parser.add_argument('--rounds', type=int, default=3, help='Passes over the sample corpus per target')
+        parser.add_argument('--concurrency', type=int, default=1, help='Requests in flight at once')
+        parser.add_argument('--record', action='store_true', help='Store LLMCall rows for router calls')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        targets = options['target'] or ["send_request", "send_request_direct", "send_api_request"]
+        server = FakeLLMServer(
+            tokens_per_sec=options['tokens_per_sec'],
+            failure_rate=options['failure_rate'],
+            prompt_delay=options['prompt_delay'],
+            completion_tokens=options['completion_tokens'],
+            seed=0,
+        )
+
+        with server:
+            self._point_llm_at(server, record=options['record'])
+            report = {
+                "server": {
+                    "tokens_per_sec": server.tokens_per_sec,
+                    "failure_rate": server.failure_rate,
+                    "prompt_delay": server.prompt_delay,
+                    "completion_tokens": server.completion_tokens,
+                },
+                "results": [self._run(name, options['rounds'], options['concurrency']) for name in targets],
+            }
+            report["backend_health"] = llm.get_router().health()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'target':<24}{'items':>7}{'failed':>8}{'items/s':>10}{'p50 (s)':>10}{'p95 (s)':>10}"
+        )
+        for result in report["results"]:
+            self.stdout.write(
+                f"{result['target']:<24}{result['items']:>7}{result['failed']:>8}"
+                f"{result['items_per_sec']:>10.2f}{result['p50']:>10.3f}{result['p95']:>10.3f}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Fake server handled {server.requests} requests ({server.failures} failed)"))
+
+    def _point_llm_at(self, server, record):
+        """Send every backend to the fake server and start from a fresh router."""
+        llm.OLLAMA_BASE_URL = server.url
+        llm.LLAMA_API_BASE_URL = f"{server.url}/v1/"
+        os.environ.setdefault('LLAMA_API_TOKEN', 'benchmark')
+
+        llm._router = None
+        router = llm.get_router()
+        if not record:
+            router.on_call = None
+        # The fake server needs no memory, don't let the host's free RAM skew routing
+        for backend in router.backends:
+            backend.min_memory_gb = None
+
+    def _run(self, name, rounds, concurrency):
+        call = TARGETS[name]
+        items = CORPUS * rounds
+
+        def timed(item):
+            title, desc, highlight = item
+            start = time.perf_counter()
+            text = call(title, desc, highlight)
+            return time.perf_counter() - start, bool(text)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(timed, items))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _ in outcomes)
+        return {
+            "target": name,
+            "items": len(items),
+            "failed": sum(1 for _, ok in outcomes if not ok),
+            "elapsed": round(elapsed, 3),
+            "items_per_sec": len(items) / elapsed if elapsed else 0.0,
+            "p50": statistics.median(latencies),
+            "p95": latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))],
+        }
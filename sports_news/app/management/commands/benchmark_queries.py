@@ -0,0 +1,193 @@
+# app/management/commands/benchmark_queries.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from app.models import PostJob
+from app.post_queue import due_jobs
+from news.models import Article
+from highlights.models import Video
+import statistics
+import random
+import json
+import time
+import uuid
+import re
+
+BATCH_SIZE = 10000
+
+# Share of seeded rows in each status, the rest are posted
+STATUS_SHARES = {"scraped": 0.0005, "generated": 0.0005, "queued": 0.0002, "failed": 0.002}
+
+class Command(BaseCommand):
+    help = "Seeds a large article/video history and checks the query plans and timings of the pipeline queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Articles to seed, videos and post jobs get a tenth of this')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+        parser.add_argument('--check', action='store_true', help='Fail if any query scans a whole table')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        # Everything is seeded and measured in one transaction that is rolled back
+        with transaction.atomic():
+            start = time.perf_counter()
+            fixtures = self._seed(options['rows'])
+            seed_seconds = round(time.perf_counter() - start, 3)
+            self._analyze()
+
+            report = {
+                "vendor": connection.vendor,
+                "rows": {model.__name__: model.objects.count() for model in (Article, Video, PostJob)},
+                "seed_seconds": seed_seconds,
+                "queries": [
+                    self._measure(name, queryset, options['repeat'])
+                    for name, queryset in self._queries(fixtures)
+                ],
+            }
+            transaction.set_rollback(True)
+
+        full_scans = [result["query"] for result in report["queries"] if result["full_scan"]]
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(f"Seeded {report['rows']} on {report['vendor']} in {seed_seconds:.1f}s")
+            self.stdout.write(f"{'query':<28}{'p50 (ms)':>10}{'max (ms)':>10}  plan")
+            for result in report["queries"]:
+                self.stdout.write(
+                    f"{result['query']:<28}{result['p50_ms']:>10.2f}{result['max_ms']:>10.2f}  "
+                    f"{'FULL SCAN' if result['full_scan'] else 'index'}"
+                )
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"    {result['plan']}")
+
+        if connection.vendor == "sqlite" and not options['json']:
+            # SQLite can't match a partial index's condition against bound parameters,
+            # so the pending and failed queries only use their indexes on PostgreSQL
+            self.stdout.write(self.style.WARNING(
+                "SQLite ignores partial indexes for parameterized queries, run on PostgreSQL for the production plans."
+            ))
+        if options['check'] and full_scans:
+            raise CommandError(f"Queries scanning a whole table: {', '.join(full_scans)}")
+        if not options['json']:
+            self.stdout.write(self.style.SUCCESS("Rolled back the seeded rows."))
+
+    def _seed(self, rows):
+        """Bulk insert rows items with a mostly posted history, returns values to query for."""
+        rng = random.Random(0)
+        now_hours = timezone.now().timestamp() / 3600
+        token = uuid.uuid4()
+
+        def status():
+            roll = rng.random()
+            for name, share in STATUS_SHARES.items():
+                if roll < share:
+                    return name
+                roll -= share
+            return "posted"
+
+        def item_fields(i, count):
+            item_status = status()
+            return {
+                "title": f"Benchmark item {i}",
+                "img_url": f"https://bench.example/{i}.jpg",
+                "status": item_status,
+                "is_new": item_status in Article.PENDING_STATUSES,
+                "thumb_status": "pending" if item_status in Article.PENDING_STATUSES else "uploaded",
+                # Some pending rows are leased to a running batch
+                "lease_token": token if item_status in Article.PENDING_STATUSES and rng.random() < 0.1 else None,
+                "priority": now_hours - (count - i) / 12 + rng.random() * 3,
+            }
+
+        def insert(model, count, build):
+            for offset in range(0, count, BATCH_SIZE):
+                model.objects.bulk_create(
+                    [build(i, count) for i in range(offset, min(offset + BATCH_SIZE, count))],
+                    batch_size=BATCH_SIZE,
+                )
+
+        insert(Article, rows, lambda i, count: Article(
+            description="A benchmark article.",
+            link=f"https://bench.example/article/{i}",
+            **item_fields(i, count),
+        ))
+        insert(Video, max(rows // 10, 1), lambda i, count: Video(
+            vid_id=f"bench{i}",
+            description="A benchmark video.",
+            embed_url=f"https://bench.example/video/{i}",
+            **item_fields(i, count),
+        ))
+        insert(PostJob, max(rows // 10, 1), lambda i, count: PostJob(
+            item_type="article",
+            item_id=i,
+            idempotency_key=PostJob.make_key("article", i),
+            text="Benchmark post",
+            title=f"Benchmark item {i}",
+            link=f"https://bench.example/article/{i}",
+            status="queued" if i >= count - 20 else "sent",
+            sent_at=None if i >= count - 20 else timezone.now(),
+        ))
+
+        return {"token": token, "link": f"https://bench.example/article/{rows // 2}", "vid_id": f"bench{rows // 20}"}
+
+    def _queries(self, fixtures):
+        """The queries the scrapers, uploader, queue and admin run, as the code builds them."""
+        now = timezone.now()
+        queries = [
+            ("scraper_link_exists", Article.objects.filter(link=fixtures["link"])[:1]),
+            ("scraper_vid_id_exists", Video.objects.filter(vid_id=fixtures["vid_id"])[:1]),
+        ]
+        for model in (Article, Video):
+            name = model.__name__.lower()
+            claimable = model.objects.filter(status__in=model.PENDING_STATUSES).filter(
+                Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+            )
+            queries += [
+                (f"{name}_claim", claimable.order_by("-priority", "id").values_list("id", flat=True)[:50]),
+                (f"{name}_claimed", model.objects.filter(lease_token=fixtures["token"]).order_by("-priority", "id")),
+                (f"{name}_generate", model.objects.filter(status="scraped", generated_text="").order_by("-priority")),
+                (f"{name}_prefetch", model.objects.filter(status__in=model.PENDING_STATUSES, thumb_status="pending")),
+                (f"{name}_requeue_failed", model.objects.filter(status="failed")),
+                (f"{name}_admin", model.objects.order_by("-timestamp", "-pk")[:100]),
+                (f"{name}_admin_failed", model.objects.filter(status="failed").order_by("-timestamp", "-pk")[:100]),
+            ]
+        queries += [
+            ("post_queue_due", due_jobs()[:1]),
+            ("post_queue_item_jobs", PostJob.objects.filter(item_type="article", item_id=1, status="failed")),
+            ("post_job_admin", PostJob.objects.order_by("-created_at", "-pk")[:100]),
+        ]
+        return queries
+
+    def _analyze(self):
+        """Refresh the planner statistics so the plans reflect the seeded tables."""
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                for model in (Article, Video, PostJob):
+                    cursor.execute(f"ANALYZE {model._meta.db_table}")
+            elif connection.vendor == "sqlite":
+                cursor.execute("ANALYZE")
+
+    def _measure(self, name, queryset, repeat):
+        plan = queryset.explain()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            # A fresh clone each run, the queryset would otherwise return its cached rows
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        return {
+            "query": name,
+            "p50_ms": round(statistics.median(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "full_scan": self._is_full_scan(plan),
+            "plan": " | ".join(line.strip() for line in plan.splitlines()),
+        }
+
+    @staticmethod
+    def _is_full_scan(plan):
+        """Whether a plan reads a whole table rather than going through an index."""
+        if connection.vendor == "postgresql":
+            return "Seq Scan" in plan
+        # SQLite prints "SCAN table" for a table scan and "SCAN table USING INDEX" otherwise
+        return any(re.search(r"\bSCAN \w+$", line.strip()) for line in plan.splitlines())
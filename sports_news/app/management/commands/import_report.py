@@ -0,0 +1,86 @@
+# app/management/commands/import_report.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import subprocess
+import sys
+import os
+
+SETUP = (
+    "import os, django; "
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sports_news.settings'); "
+    "django.setup(); "
+)
+
+# What each entry point imports before it does any work
+ENTRY_POINTS = {
+    "scrape_articles": SETUP + "from django.core.management import load_command_class; load_command_class('news', 'scrape_articles')",
+    "scrape_videos": SETUP + "from django.core.management import load_command_class; load_command_class('highlights', 'scrape_videos')",
+    "upload": SETUP + "from django.core.management import load_command_class; load_command_class('app', 'upload')",
+    "worker": SETUP + "from sports_news.celery import app; app.loader.import_default_modules()",
+}
+
+
+class Command(BaseCommand):
+    help = "Reports import time per entry point using python -X importtime and checks it against IMPORT_TIME_BUDGETS_MS"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry-point', action='append', choices=sorted(ENTRY_POINTS),
+                            help='Entry point to measure (repeatable, default: all)')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per entry point, the fastest is reported')
+        parser.add_argument('--top', type=int, default=5, help='Heaviest top-level imports to list')
+        parser.add_argument('--check', action='store_true', help='Exit with an error if any budget is exceeded')
+
+    def handle(self, *args, **options):
+        budgets = getattr(settings, 'IMPORT_TIME_BUDGETS_MS', {})
+        over_budget = []
+
+        for name in options['entry_point'] or list(ENTRY_POINTS):
+            runs = [self._measure(ENTRY_POINTS[name]) for _ in range(max(1, options['repeat']))]
+            total_ms, modules = min(runs, key=lambda run: run[0])
+            budget = budgets.get(name)
+
+            line = f"{name:<16}{total_ms:>9.1f} ms"
+            if budget:
+                line += f"  (budget {budget} ms)"
+            if budget and total_ms > budget:
+                over_budget.append(name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+            for module, cumulative_ms in modules[:options['top']]:
+                self.stdout.write(f"    {cumulative_ms:>9.1f} ms  {module}")
+
+        if options['check'] and over_budget:
+            raise CommandError(f"Import time budget exceeded for: {', '.join(over_budget)}")
+
+    def _measure(self, code):
+        """
+        Run code in a fresh interpreter with -X importtime.
+
+        Returns:
+            tuple: total import time in ms and (module, cumulative ms) pairs for
+                   top-level imports, heaviest first
+        """
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Entry point failed to import:\n{result.stderr[-2000:]}")
+
+        modules = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            # Nested imports are indented under their parent, only count top-level ones
+            if name.startswith("  "):
+                continue
+            modules.append((name.strip(), int(cumulative) / 1000))
+
+        modules.sort(key=lambda module: module[1], reverse=True)
+        return sum(ms for _, ms in modules), modules
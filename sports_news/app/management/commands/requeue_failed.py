@@ -0,0 +1,88 @@
+# app/management/commands/requeue_failed.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from app.models import PostJob
+from app.post_queue import ITEM_MODELS
+
+class Command(BaseCommand):
+    help = "Puts failed articles and videos back into the posting pipeline"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(ITEM_MODELS), help='Only requeue this item type')
+        parser.add_argument('--id', type=int, action='append', help='Only requeue this item id (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='List the items without changing them')
+
+    def handle(self, *args, **options):
+        item_types = [options['type']] if options['type'] else list(ITEM_MODELS)
+        total = 0
+        resolved = 0
+
+        for item_type in item_types:
+            items = ITEM_MODELS[item_type].objects.filter(status="failed")
+            if options['id']:
+                items = items.filter(id__in=options['id'])
+
+            for item in items:
+                total += 1
+                self.stdout.write(f"{item_type} {item.id}: {item.title} ({item.attempts} attempts, {item.last_error[:80]})")
+                if not options['dry_run']:
+                    active = self._requeue(item_type, item)
+                    if active is not None:
+                        resolved += 1
+                        self.stdout.write(f"  already has {active.status} job {active.id}, not requeued")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{total} failed items would be requeued."))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Requeued {total - resolved} failed items, {resolved} already had a queued or sent post."
+            ))
+
+    def _requeue(self, item_type, item):
+        """
+        Retry a failed post if one was queued, otherwise send the item back to the uploader.
+
+        A retried post gets a fresh set of attempts. It is flagged for the
+        feed check, since one of its earlier attempts may have gone through.
+
+        Returns:
+            PostJob or None: The queued or sent job that already holds the failed
+            job's idempotency key, in which case the item follows that job instead
+        """
+        with transaction.atomic():
+            # Only the latest failed job comes back, an item has at most one active job
+            job = PostJob.objects.filter(item_type=item_type, item_id=item.id, status="failed").order_by("-created_at").first()
+            active = None
+            if job is not None:
+                active = PostJob.objects.filter(
+                    idempotency_key=job.idempotency_key, status__in=["queued", "sent"]
+                ).first()
+            if active is not None:
+                # Requeueing would break the one active job per key constraint
+                job.last_error = f"Duplicate of job {active.id}"
+                job.save(update_fields=["last_error"])
+                if active.status == "sent":
+                    item.status = "posted"
+                    item.post_uri = active.uri
+                    item.posted_at = active.sent_at
+                else:
+                    item.status = "queued"
+                item.last_error = ""
+                item.save(update_fields=["status", "post_uri", "posted_at", "last_error"])
+                return active
+            if job is not None:
+                job.status = "queued"
+                job.attempts = 0
+                job.needs_dedupe = True
+                job.next_attempt_at = timezone.now()
+                job.last_error = ""
+                job.save(update_fields=["status", "attempts", "needs_dedupe", "next_attempt_at", "last_error"])
+                item.status = "queued"
+            else:
+                item.status = "generated" if item.generated_text else "scraped"
+                item.is_new = True
+            item.attempts = 0
+            item.last_error = ""
+            item.save(update_fields=["status", "is_new", "attempts", "last_error"])
+        return None
@@ -0,0 +1,45 @@
+# app/management/commands/restore_archived.py
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime, parse_date
+from django.utils import timezone
+from app.archive import Archiver
+from app.post_queue import ITEM_MODELS
+import datetime
+
+class Command(BaseCommand):
+    help = "Moves archived articles and videos back into their tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=sorted(ITEM_MODELS), required=True, help='Item type to restore')
+        parser.add_argument('--id', type=int, action='append', help='Restore this item id (repeatable)')
+        parser.add_argument('--key', action='append', help='Restore the item with this link or YouTube id (repeatable)')
+        parser.add_argument('--since', help='Restore items scraped on or after this date or datetime')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                date = parse_date(options['since'])
+                if date is None:
+                    raise CommandError(f"Invalid --since: {options['since']}")
+                since = datetime.datetime.combine(date, datetime.time.min)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        if not (options['id'] or options['key'] or since):
+            raise CommandError("Pass --id, --key or --since to choose what to restore")
+
+        archiver = Archiver(logger=CommandLogger(self))
+        archiver.restore(options['type'], ids=options['id'], keys=options['key'], since=since)
+
+class CommandLogger:
+    """Logger adapter for Django commands that uses Django's stdout/stderr"""
+    def __init__(self, command):
+        self.command = command
+
+    def info(self, message):
+        self.command.stdout.write(self.command.style.SUCCESS(message))
+
+    def error(self, message):
+        self.command.stdout.write(self.command.style.ERROR(message))
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('backend', models.CharField(max_length=50)),
+                ('model', models.CharField(max_length=50)),
+                ('highlight', models.BooleanField(default=False)),
+                ('success', models.BooleanField(default=True)),
+                ('prompt_chars', models.PositiveIntegerField(default=0)),
+                ('prompt_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('completion_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('queue_time', models.FloatField(blank=True, null=True)),
+                ('ttft', models.FloatField(blank=True, null=True)),
+                ('latency', models.FloatField()),
+                ('error', models.CharField(blank=True, default='', max_length=500)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['backend', 'created_at'], name='app_llmcall_backend_1d2c01_idx')],
+            },
+        ),
+    ]
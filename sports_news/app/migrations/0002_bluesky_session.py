@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlueskySession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pds_url', models.CharField(max_length=255)),
+                ('handle', models.CharField(max_length=255)),
+                ('session', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('pds_url', 'handle'), name='unique_bluesky_session')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_bluesky_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Thumbnail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('mime_type', models.CharField(max_length=50)),
+                ('size', models.PositiveIntegerField()),
+                ('blob_ref', models.JSONField(blank=True, null=True)),
+                ('uploaded_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ThumbnailSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=1000, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('checked_at', models.DateTimeField()),
+                ('thumbnail', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sources', to='app.thumbnail')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_thumbnail_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thumbnail',
+            name='source_size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_thumbnail_source_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thumbnail',
+            name='data',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
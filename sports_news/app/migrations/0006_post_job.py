@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_thumbnail_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(max_length=10)),
+                ('item_id', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('title', models.CharField(max_length=255)),
+                ('link', models.URLField(max_length=1000)),
+                ('description', models.TextField(blank=True, default='')),
+                ('img_url', models.URLField(blank=True, max_length=1000, null=True)),
+                ('thumbnail', models.BooleanField(default=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sent', 'Sent'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.CharField(blank=True, default='', max_length=500)),
+                ('uri', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='app_postjob_status_8fcd08_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_post_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postjob',
+            index=models.Index(fields=['sent_at'], name='app_postjob_sent_at_f69d91_idx'),
+        ),
+    ]
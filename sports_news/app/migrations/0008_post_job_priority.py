@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_post_job_sent_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postjob',
+            name='priority',
+            field=models.FloatField(default=0),
+        ),
+    ]
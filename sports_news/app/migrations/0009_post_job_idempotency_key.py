@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:34
+
+from django.db import migrations, models
+
+
+def backfill_keys(apps, schema_editor):
+    """
+    Key existing jobs by the item they post.
+
+    Runs that raced on an expired lease may have queued an item twice. Of its
+    queued and sent jobs, the first sent one, or else the oldest, is kept. The
+    rest are marked failed so the unique constraint can be added.
+    """
+    PostJob = apps.get_model("app", "PostJob")
+    for job in PostJob.objects.all():
+        job.idempotency_key = f"{job.item_type}:{job.item_id}"
+        job.save(update_fields=["idempotency_key"])
+
+    kept = {}
+    active = PostJob.objects.filter(status__in=["queued", "sent"])
+    # Sent jobs first, each oldest first
+    for job in sorted(active, key=lambda job: (job.status != "sent", job.created_at, job.id)):
+        if job.idempotency_key not in kept:
+            kept[job.idempotency_key] = job.id
+            continue
+        job.status = "failed"
+        job.last_error = f"Duplicate of job {kept[job.idempotency_key]}"
+        job.save(update_fields=["status", "last_error"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_post_job_priority'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postjob',
+            name='idempotency_key',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='postjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'sent'])), fields=('idempotency_key',), name='postjob_active_key_unique'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_post_job_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postjob',
+            index=models.Index(fields=['item_type', 'item_id'], name='app_postjob_item_ty_f20d4a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postjob',
+            index=models.Index(fields=['-created_at'], name='app_postjob_created_324ceb_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_post_job_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(max_length=10)),
+                ('item_id', models.PositiveIntegerField()),
+                ('key_hash', models.CharField(max_length=32)),
+                ('timestamp', models.DateTimeField()),
+                ('data', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item_type', 'item_id'], name='app_archive_item_ty_ad5ee9_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item_type', 'key_hash'), name='archiveditem_key_unique')],
+            },
+        ),
+    ]
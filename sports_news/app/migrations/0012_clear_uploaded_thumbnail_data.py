@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:02
+
+from django.db import migrations
+
+
+def clear_uploaded_data(apps, schema_editor):
+    """Drop the prepared images of thumbnails the PDS already has."""
+    Thumbnail = apps.get_model("app", "Thumbnail")
+    Thumbnail.objects.filter(blob_ref__isnull=False, data__isnull=False).update(data=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_archived_item'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_uploaded_data, migrations.RunPython.noop),
+    ]
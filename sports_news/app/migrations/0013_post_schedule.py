@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+def create_schedule(apps, schema_editor):
+    PostSchedule = apps.get_model("app", "PostSchedule")
+    PostSchedule.objects.get_or_create(name="posts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_clear_uploaded_thumbnail_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+        ),
+        migrations.RunPython(create_schedule, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_post_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postjob',
+            name='displacements',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
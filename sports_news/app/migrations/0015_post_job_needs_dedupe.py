@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_post_job_displacements'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postjob',
+            name='needs_dedupe',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,170 @@
+from django.db import models
+from django.utils import timezone
+
+class LLMCall(models.Model):
+    """One request to an LLM backend, recorded by the router for every attempt."""
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    backend = models.CharField(max_length=50)
+    model = models.CharField(max_length=50)
+    highlight = models.BooleanField(default=False)
+    success = models.BooleanField(default=True)
+    prompt_chars = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)
+    queue_time = models.FloatField(null=True, blank=True)
+    ttft = models.FloatField(null=True, blank=True)
+    latency = models.FloatField()
+    error = models.CharField(max_length=500, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["backend", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.backend} ({self.model}) {self.latency:.2f}s"
+
+class BlueskySession(models.Model):
+    """An exported atproto session, encrypted at rest, reused across task runs."""
+    pds_url = models.CharField(max_length=255)
+    handle = models.CharField(max_length=255)
+    session = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["pds_url", "handle"], name="unique_bluesky_session"),
+        ]
+
+    def __str__(self):
+        return f"{self.handle} @ {self.pds_url}"
+
+class Thumbnail(models.Model):
+    """
+    A thumbnail image identified by the hash of its source bytes, with the
+    prepared (possibly transcoded) image and the blob ref it was uploaded as.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    mime_type = models.CharField(max_length=50)
+    size = models.PositiveIntegerField()
+    source_size = models.PositiveIntegerField(default=0)
+    data = models.BinaryField(null=True, blank=True)
+    blob_ref = models.JSONField(null=True, blank=True)
+    uploaded_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.content_hash
+
+class ThumbnailSource(models.Model):
+    """A thumbnail URL with the HTTP validators needed to revalidate it cheaply."""
+    url = models.URLField(max_length=1000, unique=True)
+    thumbnail = models.ForeignKey(Thumbnail, on_delete=models.CASCADE, related_name="sources")
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    checked_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.url
+
+class PostJob(models.Model):
+    """
+    A post waiting to be sent to Bluesky.
+
+    Jobs stay in the table until they are sent or run out of attempts, so a
+    failed or rate-limited post is retried on a later run instead of lost.
+    next_attempt_at is the job's send slot, or its next retry after a failure.
+
+    idempotency_key identifies the item being posted. At most one queued or
+    sent job exists per key, and a retry first checks our feed for the post so
+    an attempt that succeeded despite an error isn't posted twice.
+    """
+    item_type = models.CharField(max_length=10)
+    item_id = models.PositiveIntegerField()
+    idempotency_key = models.CharField(max_length=64)
+    text = models.TextField()
+    title = models.CharField(max_length=255)
+    link = models.URLField(max_length=1000)
+    description = models.TextField(blank=True, default="")
+    img_url = models.URLField(max_length=1000, null=True, blank=True)
+    thumbnail = models.BooleanField(default=True)
+    # Copied from the item, a more important post takes the slot of a less important one
+    priority = models.FloatField(default=0)
+    # Times a more important post took this one's slot, capped so it isn't pushed back forever
+    displacements = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=10, default="queued", choices=[
+        ("queued", "Queued"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ])
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Set when a job that was attempted before is requeued with its attempts reset
+    needs_dedupe = models.BooleanField(default=False)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.CharField(max_length=500, blank=True, default="")
+    uri = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+            models.Index(fields=["sent_at"]),
+            # requeue_failed looks up the jobs of an item
+            models.Index(fields=["item_type", "item_id"]),
+            # The admin's newest-first changelist
+            models.Index(fields=["-created_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["idempotency_key"],
+                condition=models.Q(status__in=["queued", "sent"]),
+                name="postjob_active_key_unique",
+            ),
+        ]
+
+    @staticmethod
+    def make_key(item_type, item_id):
+        return f"{item_type}:{item_id}"
+
+    def __str__(self):
+        return f"{self.item_type} {self.item_id}: {self.title} ({self.status})"
+
+class PostSchedule(models.Model):
+    """
+    The row locked while a post is given its send slot.
+
+    Slots are assigned by reading the last one and inserting after it, so
+    concurrent enqueues take turns on this row instead of all getting the
+    same slot.
+    """
+    name = models.CharField(max_length=50, unique=True)
+
+    def __str__(self):
+        return self.name
+
+class ArchivedItem(models.Model):
+    """
+    An Article or Video moved out of its table by the retention job.
+
+    data holds the serialized row, zstd-compressed, so it can be restored as
+    it was. key_hash is a hash of the link or YouTube id the scrapers dedupe
+    on, so archived items are not scraped again.
+    """
+    item_type = models.CharField(max_length=10)
+    item_id = models.PositiveIntegerField()
+    key_hash = models.CharField(max_length=32)
+    timestamp = models.DateTimeField()
+    data = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["item_type", "key_hash"], name="archiveditem_key_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["item_type", "item_id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.item_type} {self.item_id} (archived {self.archived_at:%Y-%m-%d})"
@@ -0,0 +1,68 @@
+from collections import Counter
+import statistics
+import time
+
+def new_state(item_type, item_id, lease_token):
+    """The dict passed along an item's generate -> thumbnail -> post chain."""
+    return {
+        "type": item_type,
+        "id": item_id,
+        "lease_token": lease_token,
+        "stages": {},
+        "errors": {},
+        "routing": None,
+        "outcome": None,
+    }
+
+def run_stage(state, name, func):
+    """
+    Run one stage of an item's chain, recording its duration and any error on state.
+
+    Errors are kept on the state instead of raised so the rest of the chain and
+    the batch report still run; each stage decides what a missing result means.
+    """
+    start_time = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        state["errors"][name] = str(e)[:500]
+    state["stages"][name] = round(time.perf_counter() - start_time, 3)
+    return state
+
+def summarize(results, dispatched_at=None):
+    """
+    Aggregate the final states of a batch of item chains.
+
+    Returns:
+        dict: Outcome counts, per-stage timing stats, the LLM routing decisions
+              and the errors by item.
+    """
+    durations = {}
+    errors = []
+    for state in results:
+        for name, seconds in state["stages"].items():
+            durations.setdefault(name, []).append(seconds)
+        for name, error in state["errors"].items():
+            errors.append({"type": state["type"], "id": state["id"], "stage": name, "error": error})
+
+    report = {
+        "items": len(results),
+        "outcomes": dict(Counter(state["outcome"] or "error" for state in results)),
+        "stages": {name: _timing(seconds) for name, seconds in durations.items()},
+        "routing": [state["routing"] for state in results if state.get("routing")],
+        "errors": errors,
+    }
+    if dispatched_at is not None:
+        report["wall_seconds"] = round(time.time() - dispatched_at, 3)
+    return report
+
+def _timing(seconds):
+    ordered = sorted(seconds)
+    return {
+        "count": len(ordered),
+        "total": round(sum(ordered), 3),
+        "mean": round(statistics.mean(ordered), 3),
+        "p50": round(statistics.median(ordered), 3),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "max": ordered[-1],
+    }
@@ -0,0 +1,344 @@
+from app.models import PostJob, PostSchedule
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+from news.models import Article
+from highlights.models import Video
+from datetime import timedelta
+import random
+import time
+
+ITEM_MODELS = {"article": Article, "video": Video}
+
+def due_jobs():
+    """Queued jobs whose send slot has come, in slot order."""
+    return PostJob.objects.filter(status="queued", next_attempt_at__lte=timezone.now()).order_by("next_attempt_at", "id")
+
+def lock_schedule():
+    """Lock the post schedule until the current transaction ends."""
+    if PostSchedule.objects.select_for_update().filter(name="posts").first() is None:
+        # Created by the migration, only missing if someone deleted it
+        PostSchedule.objects.get_or_create(name="posts")
+        PostSchedule.objects.select_for_update().get(name="posts")
+
+def next_slot():
+    """
+    The send slot for a newly queued post.
+
+    Posts are spread out at POST_TARGET_PER_HOUR and at least
+    POST_MIN_SPACING_SECONDS apart, after the last queued or sent post, so a
+    batch drips out over the hour instead of going out at once. Retries keep
+    their own backoff and don't move the schedule.
+
+    Must be called in the transaction that inserts the post. The schedule stays
+    locked until that transaction commits, so parallel enqueues see each
+    other's slots.
+    """
+    now = timezone.now()
+    if not getattr(settings, 'POST_DRIP_FEED', True):
+        return now
+    lock_schedule()
+
+    spacing = timedelta(seconds=max(
+        getattr(settings, 'POST_MIN_SPACING_SECONDS', 120),
+        3600 / max(getattr(settings, 'POST_TARGET_PER_HOUR', 12), 1),
+    ))
+    last_slot = PostJob.objects.filter(status="queued", attempts=0).aggregate(last=Max("next_attempt_at"))["last"]
+    last_sent = PostJob.objects.filter(status="sent").aggregate(last=Max("sent_at"))["last"]
+    latest = max(filter(None, (last_slot, last_sent)), default=None)
+    return max(now, latest + spacing) if latest else now
+
+class PostQueue:
+    """
+    A class to send queued posts to Bluesky within the PDS rate limits.
+
+    Sends wait for the RateLimit tracked by the client. Transient failures are
+    retried with exponential backoff on a later drain, and jobs that keep failing
+    are marked failed after POST_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, bsky_client, logger=None):
+        """
+        Initialize the queue.
+
+        Args:
+            bsky_client: A logged in BlueSkyClient used to send posts, not needed to only enqueue
+            logger: A callable object with methods for logging (info, error, etc.)
+                   If None, print statements will be used.
+        """
+        self.bsky_client = bsky_client
+        self.logger = logger
+        self.max_attempts = getattr(settings, 'POST_MAX_ATTEMPTS', 5)
+        self.retry_base = getattr(settings, 'POST_RETRY_BASE_SECONDS', 30)
+        self.retry_max = getattr(settings, 'POST_RETRY_MAX_SECONDS', 3600)
+        self.max_wait = getattr(settings, 'POST_MAX_WAIT_SECONDS', 60)
+        self.promote_margin = getattr(settings, 'POST_PROMOTE_MARGIN', 1.0)
+        self.max_displacements = getattr(settings, 'POST_MAX_DISPLACEMENTS', 2)
+        self.max_depth = getattr(settings, 'POST_MAX_QUEUE_DEPTH', 72)
+        self.posts = []
+
+    def log_info(self, message):
+        """Log an informational message."""
+        if self.logger:
+            self.logger.info(message)
+        else:
+            print(message)
+
+    def log_error(self, message):
+        """Log an error message."""
+        if self.logger:
+            self.logger.error(message)
+        else:
+            print(f"ERROR: {message}")
+
+    def enqueue(self, item_type, item, text, link, description="", img_url=None, thumbnail=True):
+        """
+        Queue a post for an Article or Video in the next free send slot.
+
+        An item that already has a queued or sent job keeps that job, so an item
+        queued twice, e.g. by two runs racing after a lease expired, is posted once.
+        """
+        key = PostJob.make_key(item_type, item.id)
+        try:
+            with transaction.atomic():
+                return PostJob.objects.create(
+                    item_type=item_type,
+                    item_id=item.id,
+                    idempotency_key=key,
+                    text=text,
+                    title=item.title,
+                    link=link,
+                    description=description,
+                    img_url=img_url,
+                    thumbnail=thumbnail,
+                    priority=item.priority,
+                    next_attempt_at=next_slot(),
+                )
+        except IntegrityError:
+            job = PostJob.objects.get(idempotency_key=key, status__in=["queued", "sent"])
+            self.log_info(f"{item_type} {item.id} already has a {job.status} post, not queueing it again")
+            if job.status == "sent":
+                ITEM_MODELS[item_type].objects.filter(id=item.id).update(
+                    status="posted", post_uri=job.uri, posted_at=job.sent_at
+                )
+            return job
+
+    def drain(self):
+        """
+        Send every job whose slot has come, in slot order.
+
+        Stops early when the rate limit would make the next send wait longer than
+        POST_MAX_WAIT_SECONDS; the remaining jobs are picked up by the next run.
+
+        Returns:
+            Dict with counts per outcome, the sent posts and the titles of the
+            posts dropped from an overfull queue.
+        """
+        report = {"sent": 0, "recovered": 0, "retrying": 0, "failed": 0, "skipped": 0, "deferred": 0}
+        report["dropped"] = self._trim()
+        attempted = set()
+
+        while True:
+            job = due_jobs().exclude(id__in=attempted).first()
+            if job is None:
+                break
+
+            wait = self.bsky_client.rate_limit.wait_time()
+            if wait > self.max_wait:
+                report["deferred"] = self._defer(wait)
+                self.log_info(f"Rate limited for {wait:.0f} seconds, deferred {report['deferred']} posts")
+                break
+            if wait > 0:
+                time.sleep(wait)
+
+            job = self._promote(job)
+            attempted.add(job.id)
+            report[self.send(job)] += 1
+
+        report["posts"] = self.posts
+        report["rate_limit"] = self.bsky_client.rate_limit.snapshot()
+        return report
+
+    def send(self, job):
+        """
+        Send a single job and record the outcome on it.
+
+        Returns:
+            str: "sent", "recovered" if an earlier attempt turned out to have posted it,
+                 "retrying", "failed", or "skipped" if another worker is sending it
+        """
+        # Claim the attempt, only one of two workers that picked up the same job gets it
+        claimed = PostJob.objects.filter(id=job.id, status="queued", attempts=job.attempts).update(
+            attempts=F("attempts") + 1
+        )
+        if not claimed:
+            return "skipped"
+        job.attempts += 1
+        try:
+            post = self._find_sent(job) if job.attempts > 1 or job.needs_dedupe else None
+            post = post or self.bsky_client.upload_content(
+                text=job.text,
+                title=job.title,
+                link=job.link,
+                description=job.description,
+                img_url=job.img_url,
+                thumbnail=job.thumbnail
+            )
+        except Exception as e:
+            job.last_error = str(e)[:500]
+            if self._is_transient(e) and job.attempts < self.max_attempts:
+                # A 429 has already pushed the rate limit's reset out, never retry before it
+                delay = max(self._backoff(job.attempts), timedelta(seconds=self.bsky_client.rate_limit.wait_time()))
+                job.next_attempt_at = timezone.now() + delay
+                job.save(update_fields=["attempts", "last_error", "next_attempt_at"])
+                self._update_item(job, last_error=job.last_error)
+                self.log_error(f"Post '{job.title}' failed (attempt {job.attempts}), retrying after {job.next_attempt_at}: {e}")
+                return "retrying"
+
+            job.status = "failed"
+            job.save(update_fields=["attempts", "last_error", "status"])
+            self._update_item(job, status="failed", last_error=job.last_error)
+            self.log_error(f"Post '{job.title}' failed after {job.attempts} attempts: {e}")
+            return "failed"
+        finally:
+            self.bsky_client.rate_limit.mark_sent()
+
+        job.status = "sent"
+        job.uri = post["uri"]
+        job.sent_at = timezone.now()
+        job.last_error = ""
+        job.needs_dedupe = False
+        job.save(update_fields=["attempts", "status", "uri", "sent_at", "last_error", "needs_dedupe"])
+        self._update_item(job, status="posted", post_uri=job.uri, posted_at=job.sent_at, last_error="")
+        self.posts.append({"title": job.title, "scrape_to_post": self._scrape_to_post(job), **post})
+        if post.get("recovered"):
+            # Nothing was sent, don't count it as a post
+            self.log_info(f"Recorded the earlier post of {job.item_type}: {job.title}")
+            return "recovered"
+        self.log_info(f"Successfully posted {job.item_type}: {job.title} at {job.sent_at}")
+        return "sent"
+
+    def _find_sent(self, job):
+        """
+        Check our feed for a post made by an earlier attempt at job.
+
+        An attempt that timed out, or whose worker died, may still have created
+        the post, so any retry looks for it before sending again, including the
+        first attempt of a job requeue_failed put back.
+
+        Returns:
+            dict or None: The post, marked as recovered, if it was found
+        """
+        uri = self.bsky_client.find_post(job.link)
+        if uri is None:
+            return None
+        self.log_info(f"'{job.title}' was already posted by an earlier attempt as {uri}")
+        return {"uri": uri, "recovered": True}
+
+    def _promote(self, job):
+        """
+        Swap a due job's slot with the most important job queued behind it.
+
+        Slots are handed out in the order items were queued, so breaking news
+        queued after a batch of previews would otherwise wait for all of them.
+        Only first attempts are swapped, retries keep their backoff.
+
+        Priorities grow with publish time, so a later job has to outrank the due
+        one by POST_PROMOTE_MARGIN hours, and a job gives up its slot at most
+        POST_MAX_DISPLACEMENTS times. Both rows are locked for the swap. Rows
+        another worker has locked are passed over, never waited on.
+
+        Returns:
+            PostJob: The job to send now, job itself if nothing outranks it
+        """
+        if job.attempts or job.displacements >= self.max_displacements:
+            return job
+
+        with transaction.atomic():
+            better = PostJob.objects.select_for_update(skip_locked=True).filter(
+                status="queued",
+                attempts=0,
+                priority__gt=job.priority + self.promote_margin,
+                next_attempt_at__gt=job.next_attempt_at,
+            ).order_by("-priority", "next_attempt_at").first()
+            if better is None:
+                return job
+            # The due job may have been sent or moved since it was read
+            locked = PostJob.objects.select_for_update(skip_locked=True).filter(
+                id=job.id, status="queued", attempts=0, next_attempt_at=job.next_attempt_at
+            ).first()
+            if locked is None:
+                return job
+
+            better.next_attempt_at, job.next_attempt_at = job.next_attempt_at, better.next_attempt_at
+            job.displacements += 1
+            better.save(update_fields=["next_attempt_at"])
+            job.save(update_fields=["next_attempt_at", "displacements"])
+        self.log_info(f"'{better.title}' outranks '{job.title}', moved it up to {better.next_attempt_at}")
+        return better
+
+    def _trim(self):
+        """
+        Drop the least important queued posts past POST_MAX_QUEUE_DEPTH.
+
+        Slots are spaced out, so a backlog larger than the feed rate would hand
+        out slots hours ahead and post stale news. Only first attempts count,
+        retries keep their backoff. Dropped jobs are marked failed, like a job
+        out of attempts, so requeue_failed can still put one back.
+
+        Returns:
+            list: Titles of the dropped posts
+        """
+        if not self.max_depth:
+            return []
+        overflow = list(
+            PostJob.objects.filter(status="queued", attempts=0)
+            .order_by("-priority", "next_attempt_at", "id")
+            .values_list("id", "item_type", "item_id", "title")[self.max_depth:]
+        )
+        if not overflow:
+            return []
+
+        error = f"Dropped, more than {self.max_depth} posts were queued"
+        dropped = []
+        for job_id, item_type, item_id, title in overflow:
+            # Skip a job another worker started sending meanwhile
+            if PostJob.objects.filter(id=job_id, status="queued", attempts=0).update(status="failed", last_error=error):
+                ITEM_MODELS[item_type].objects.filter(id=item_id).update(status="failed", last_error=error)
+                dropped.append(title)
+        if dropped:
+            self.log_error(f"Queue over {self.max_depth} posts, dropped {len(dropped)}: {', '.join(dropped)}")
+        return dropped
+
+    def _update_item(self, job, **fields):
+        """Mirror a send attempt onto the Article or Video the job was queued for."""
+        ITEM_MODELS[job.item_type].objects.filter(id=job.item_id).update(attempts=F("attempts") + 1, **fields)
+
+    def _scrape_to_post(self, job):
+        """Seconds from the item being scraped to its post being sent."""
+        scraped_at = ITEM_MODELS[job.item_type].objects.filter(id=job.item_id).values_list("timestamp", flat=True).first()
+        return round((job.sent_at - scraped_at).total_seconds(), 3) if scraped_at else None
+
+    def _backoff(self, attempts):
+        """Exponential backoff with jitter, so retries after an outage don't all fire at once."""
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return timedelta(seconds=random.uniform(delay / 2, delay))
+
+    def _defer(self, wait):
+        """Push every due job past the rate-limit reset."""
+        return PostJob.objects.filter(status="queued", next_attempt_at__lte=timezone.now()).update(
+            next_attempt_at=timezone.now() + timedelta(seconds=wait)
+        )
+
+    @staticmethod
+    def _is_transient(error):
+        """Network errors, rate limiting and server errors are worth retrying, bad requests are not."""
+        from atproto_client.exceptions import NetworkError
+        import requests
+
+        response = getattr(error, 'response', None)
+        status_code = getattr(response, 'status_code', None)
+        if status_code is not None:
+            return status_code in (408, 429) or status_code >= 500
+        return isinstance(error, (NetworkError, requests.exceptions.RequestException, OSError))
@@ -0,0 +1,131 @@
+from app.utils.bluesky_client import BlueSkyClient, get_client
+from app.utils.thumbnails import fetch_thumbnail, upload_thumbnail
+from django.utils import timezone
+from news.models import Article
+from highlights.models import Video
+
+class ThumbnailPrefetcher:
+    """
+    A class to download, validate and prepare thumbnails for newly scraped articles and videos.
+    This runs as a background stage after scraping so the upload step doesn't touch images.
+    """
+
+    def __init__(self, pds_url=None, preupload=False, logger=None):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            pds_url: PDS to log in to when pre-uploading blobs.
+            preupload: Also upload prepared thumbnails as blobs ahead of posting.
+            logger: A callable object with methods for logging (info, error, etc.)
+                   If None, print statements will be used.
+        """
+        self.logger = logger
+        self.pds_url = pds_url
+        self.preupload = preupload
+        self._client = None
+
+    def log_info(self, message):
+        """Log an informational message."""
+        if self.logger:
+            self.logger.info(message)
+        else:
+            print(message)
+
+    def log_error(self, message):
+        """Log an error message."""
+        if self.logger:
+            self.logger.error(message)
+        else:
+            print(f"ERROR: {message}")
+
+    @property
+    def client(self):
+        """Bluesky client for pre-uploads, logged in on first use."""
+        if self._client is None:
+            self._client = get_client(self.pds_url).client
+        return self._client
+
+    def prefetch_pending(self, article_ids=None, video_ids=None):
+        """
+        Prepare thumbnails for new items that haven't been checked yet.
+
+        Args:
+            article_ids: Optional list of Article ids to restrict prefetching to.
+            video_ids: Optional list of Video ids to restrict prefetching to.
+
+        Returns:
+            Dict with counts per outcome and the per-item cache info.
+        """
+        articles = Article.objects.filter(status__in=Article.PENDING_STATUSES, thumb_status="pending")
+        videos = Video.objects.filter(status__in=Video.PENDING_STATUSES, thumb_status="pending")
+        if article_ids is not None:
+            articles = articles.filter(id__in=article_ids)
+        if video_ids is not None:
+            videos = videos.filter(id__in=video_ids)
+
+        report = {"ready": 0, "uploaded": 0, "failed": 0, "pending": 0, "items": []}
+
+        for article in articles:
+            info = self.prefetch_item(article, article.link)
+            report[article.thumb_status] += 1
+            report["items"].append({"type": "article", "id": article.id, "status": article.thumb_status, **info})
+
+        for video in videos:
+            info = self.prefetch_item(video, video.embed_url)
+            report[video.thumb_status] += 1
+            report["items"].append({"type": "video", "id": video.id, "status": video.thumb_status, **info})
+
+        self.log_info(
+            f"Prefetched thumbnails: {report['ready']} ready, {report['uploaded']} uploaded, "
+            f"{report['failed']} failed, {report['pending']} left to retry"
+        )
+        return report
+
+    def prefetch_item(self, item, link):
+        """
+        Prepare the thumbnail for a single Article or Video and record the outcome on it.
+
+        Only an item without a usable image is marked failed and posted without a
+        thumbnail. After a transient error, such as a timeout or a 5xx, it stays
+        pending and the image is tried again when it is posted.
+
+        Returns:
+            dict: Cache info for the thumbnail URL.
+        """
+        url = BlueSkyClient.thumbnail_url(link, item.img_url)
+        if not url:
+            info = {"url": None, "cache": "error", "error": "no image"}
+            thumbnail = None
+        else:
+            try:
+                thumbnail, info = fetch_thumbnail(url)
+            except Exception as e:
+                thumbnail, info = None, {"url": url, "cache": "error", "error": str(e), "transient": True}
+
+        if thumbnail is None and info.get("transient"):
+            item.thumb_status = "pending"
+            item.thumb_error = info.get("error", "")[:255]
+            self.log_error(f"Could not fetch thumbnail for '{item.title}', will retry: {item.thumb_error}")
+        elif thumbnail is None:
+            item.thumb_status = "failed"
+            item.thumb_error = info.get("error", "")[:255]
+            self.log_error(f"No usable thumbnail for '{item.title}': {item.thumb_error}")
+        elif thumbnail.blob_ref:
+            item.thumb_status = "uploaded"
+        elif self.preupload:
+            try:
+                upload_thumbnail(self.client, thumbnail, info)
+                item.thumb_status = "uploaded"
+            except Exception as e:
+                # The image is still prepared, the upload will happen at posting time
+                self.log_error(f"Error pre-uploading thumbnail for '{item.title}': {e}")
+                item.thumb_status = "ready"
+        else:
+            item.thumb_status = "ready"
+
+        if thumbnail is not None:
+            item.thumb_error = ""
+        item.thumb_checked_at = timezone.now()
+        item.save(update_fields=["thumb_status", "thumb_error", "thumb_checked_at"])
+        return info
@@ -1,7 +1,20 @@
-from celery import shared_task
-from app.uploader import ContentUploader
+from celery import shared_task, chain, chord
+from app.uploader import ContentUploader, claim_items, renew_lease, by_priority
+from app.generator import PostGenerator
+from app.prefetcher import ThumbnailPrefetcher
+from app.archive import Archiver
+from app.post_queue import PostQueue, ITEM_MODELS, due_jobs
+from app.utils.bluesky_client import get_client
+from app.utils.locks import single_flight, get_redis
+from app import pipeline
+from django.conf import settings
+from django.utils import timezone
+from news.models import Article
+from news.utils.snapshots import prune_snapshots
+from highlights.models import Video
 from dotenv import load_dotenv
 import logging
+import time
 import os
 
 load_dotenv()
@@ -10,12 +23,214 @@ pds_host = os.getenv('PDS_HOST')
 
 logger = logging.getLogger(__name__)
 
-@shared_task(bind=True, soft_time_limit=600, time_limit=18000)
+@shared_task(bind=True)
+@single_flight("upload_to_bluesky", merge=True)
 def upload_to_bluesky(self):
-    """Celery task to upload content to Bluesky"""
+    """
+    Celery task that claims new items and dispatches one generate -> thumbnail -> post
+    chain per item, so items run in parallel and fail on their own
+    """
     task_logger = TaskLogger(self.request.id)
-    uploader = ContentUploader(pds_url=pds_host, logger=task_logger)
-    return uploader.upload_all()
+    article_lease, new_articles = claim_items(Article)
+    video_lease, new_videos = claim_items(Video)
+    leases = {"article": str(article_lease), "video": str(video_lease)}
+
+    # Earlier posts whose slot or retry has come are sent alongside the new ones
+    if due_jobs().exists():
+        drain_post_queue.delay()
+
+    chains = [
+        item_chain(item_type, item.id, leases[item_type])
+        for item_type, item in by_priority(new_articles, new_videos)
+    ]
+    if not chains:
+        task_logger.info("No new articles or videos to upload.")
+        return {"message": "No new articles or videos to upload.", "dispatched": 0}
+
+    report = chord(chains)(collect_upload_report.s(dispatched_at=time.time()))
+    task_logger.info(f"Dispatched {len(new_articles)} articles and {len(new_videos)} videos")
+    return {
+        "message": f"Dispatched {len(new_articles)} articles and {len(new_videos)} videos.",
+        "dispatched": len(chains),
+        "report_task_id": report.id,
+    }
+
+def trigger_upload():
+    """
+    Schedule an upload UPLOAD_DEBOUNCE_SECONDS from now unless one is already scheduled.
+
+    Called by the scrape tasks when they insert rows, so new items are posted within
+    the debounce window instead of at the next hourly upload. Scrapes that land in
+    the same window join the one scheduled batch.
+
+    Returns:
+        str: "scheduled", or "debounced" if an upload was already scheduled
+    """
+    debounce = getattr(settings, 'UPLOAD_DEBOUNCE_SECONDS', 90)
+    client = get_redis()
+    if client is not None:
+        try:
+            if not client.set("upload-trigger", 1, nx=True, ex=max(1, int(debounce))):
+                return "debounced"
+        except Exception as e:
+            logger.warning(f"Upload debounce unavailable, scheduling anyway: {e}")
+
+    upload_to_bluesky.apply_async(countdown=debounce)
+    return "scheduled"
+
+def item_chain(item_type, item_id, lease_token):
+    """The per-item pipeline: generate text, prepare the thumbnail, then post."""
+    return chain(
+        generate_item_text.s(item_type, item_id, lease_token),
+        prepare_item_thumbnail.s(),
+        post_item.s(),
+    )
+
+def holds_lease(state):
+    """
+    Renew the item's lease before a chain stage, or mark the chain skipped.
+
+    Chains wait in the queues for a while, so the claim-time lease may have run
+    out and the item may have been reclaimed by a later upload, which then does
+    the work instead.
+    """
+    if state["outcome"] == "skipped":
+        return False
+    if not renew_lease(ITEM_MODELS[state["type"]], state["id"], state["lease_token"]):
+        state["outcome"] = "skipped"
+        state["errors"]["lease"] = "lease taken over by another upload"
+        return False
+    return True
+
+@shared_task(bind=True, soft_time_limit=600, time_limit=900)
+def generate_item_text(self, item_type, item_id, lease_token):
+    """Chain stage: generate post text for one item unless it was pre-generated"""
+    state = pipeline.new_state(item_type, item_id, lease_token)
+    if not holds_lease(state):
+        return state
+    item = ITEM_MODELS[item_type].objects.get(id=item_id)
+    state["title"] = item.title
+
+    def generate():
+        if not item.generated_text:
+            generator = PostGenerator(logger=TaskLogger(self.request.id))
+            generated = generator.generate_item(item, highlight=item_type == "video")
+            if generator.last_routing:
+                state["routing"] = {"title": item.title, **generator.last_routing}
+            if not generated:
+                raise RuntimeError("no text generated")
+
+    # Without text the post stage posts the title, it never calls the LLM itself
+    return pipeline.run_stage(state, "generate", generate)
+
+@shared_task(bind=True, soft_time_limit=60, time_limit=120)
+def prepare_item_thumbnail(self, state):
+    """Chain stage: download and prepare one item's thumbnail unless the prefetch already did"""
+    if not holds_lease(state):
+        return state
+    item = ITEM_MODELS[state["type"]].objects.get(id=state["id"])
+
+    def prepare():
+        if item.thumb_status == "pending":
+            link = item.link if state["type"] == "article" else item.embed_url
+            ThumbnailPrefetcher(pds_url=pds_host, logger=TaskLogger(self.request.id)).prefetch_item(item, link)
+
+    return pipeline.run_stage(state, "thumbnail", prepare)
+
+@shared_task(bind=True, soft_time_limit=60, time_limit=120)
+def post_item(self, state):
+    """Chain stage: queue one item's post for the dispatcher, waking it if the post is due"""
+    if not holds_lease(state):
+        return state
+    item = ITEM_MODELS[state["type"]].objects.get(id=state["id"])
+
+    def post():
+        uploader = ContentUploader(pds_url=pds_host, logger=TaskLogger(self.request.id))
+        job = uploader.queue_item(state["type"], item, state["lease_token"])
+        state["outcome"] = job.status if job else "skipped"
+        if job and job.status == "queued" and job.next_attempt_at <= timezone.now():
+            # Sent by the single-flight dispatcher, never by parallel chains
+            drain_post_queue.delay()
+
+    return pipeline.run_stage(state, "post", post)
+
+@shared_task(bind=True)
+def collect_upload_report(self, results, dispatched_at=None):
+    """Chord callback aggregating per-stage timings and outcomes for a dispatched batch"""
+    task_logger = TaskLogger(self.request.id)
+    report = pipeline.summarize(results, dispatched_at=dispatched_at)
+    task_logger.info(f"Upload batch of {report['items']} items finished: {report['outcomes']}")
+    return report
+
+@shared_task(bind=True, soft_time_limit=600, time_limit=1800)
+@single_flight("drain_post_queue", merge=True)
+def drain_post_queue(self):
+    """
+    Celery task run every minute, and when a chain queues a due post, to send queued
+    posts whose slot has come and due retries. It is the only task that posts, so sends
+    share the worker's client and rate limit
+    """
+    # Most minutes nothing is due, don't log in to Bluesky for that
+    if not due_jobs().exists():
+        return {"sent": 0}
+    task_logger = TaskLogger(self.request.id)
+    # The client is cached per worker, so only count the logins and refreshes of this run
+    misses = get_client.cache_info().misses
+    client = get_client(pds_host)
+    logged_in = get_client.cache_info().misses > misses
+    before = {"password_logins": 0, "refreshes": 0} if logged_in else dict(client.login_stats)
+    report = PostQueue(client, logger=task_logger).drain()
+    report["login"] = {
+        "method": client.login_stats["method"] if logged_in else "cached",
+        "password_logins": client.login_stats["password_logins"] - before["password_logins"],
+        "refreshes": client.login_stats["refreshes"] - before["refreshes"],
+        "login_seconds": client.login_stats["login_seconds"] if logged_in else 0.0,
+    }
+    return report
+
+@shared_task(bind=True, soft_time_limit=1800, time_limit=3600)
+def pregenerate_posts(self, article_ids=None, video_ids=None, then_upload=False):
+    """
+    Celery task to generate post text for newly scraped items ahead of upload. With
+    then_upload, the debounced upload is triggered once generation is done, so it
+    doesn't claim items still being generated and generate them a second time
+    """
+    task_logger = TaskLogger(self.request.id)
+    generator = PostGenerator(logger=task_logger)
+    try:
+        report = generator.generate_pending(article_ids=article_ids, video_ids=video_ids)
+    finally:
+        if then_upload:
+            # Post the new rows soon instead of at the next hourly upload, even if generation failed
+            upload_trigger = trigger_upload()
+    if then_upload:
+        report["upload_trigger"] = upload_trigger
+    return report
+
+@shared_task(bind=True, soft_time_limit=600, time_limit=1800)
+def prefetch_thumbnails(self, article_ids=None, video_ids=None):
+    """Celery task to download and prepare thumbnails for newly scraped items ahead of upload"""
+    task_logger = TaskLogger(self.request.id)
+    prefetcher = ThumbnailPrefetcher(
+        pds_url=pds_host,
+        preupload=getattr(settings, 'THUMBNAIL_PREUPLOAD', False),
+        logger=task_logger
+    )
+    return prefetcher.prefetch_pending(article_ids=article_ids, video_ids=video_ids)
+
+@shared_task(bind=True, soft_time_limit=1800, time_limit=3600)
+@single_flight("archive_old_items")
+def archive_old_items(self):
+    """
+    Celery task moving posted and failed items past the retention window into the archive,
+    and pruning page snapshots past theirs
+    """
+    task_logger = TaskLogger(self.request.id)
+    archiver = Archiver(logger=task_logger)
+    report = archiver.archive_old()
+    report["pruned_snapshots"] = prune_snapshots()
+    task_logger.info(f"Pruned {report['pruned_snapshots']} of the page snapshots")
+    return report
 
 class TaskLogger:
     """Logger adapter for Celery tasks that maintains consistent format"""
@@ -1,9 +1,73 @@
-from app.utils.bluesky_client import BlueSkyClient
+from app.utils.bluesky_client import BlueSkyClient, get_client
 from app.utils import llm as llm
+from app.post_queue import PostQueue
 from django.db import transaction
+from django.db.models import Q
+from django.conf import settings
+from django.utils import timezone
 from news.models import Article
 from highlights.models import Video
 import datetime
+import heapq
+import uuid
+
+def claim_items(model):
+    """
+    Lease a batch of up to UPLOAD_BATCH_SIZE pending items of one model.
+
+    The claim is a single conditional UPDATE in its own short transaction, so
+    no row locks are held while generating or posting. Items whose lease has
+    expired, e.g. because a worker died mid-run, are claimable again.
+
+    Returns:
+        tuple: (lease token, list of claimed items)
+    """
+    now = timezone.now()
+    token = uuid.uuid4()
+    lease_seconds = getattr(settings, 'UPLOAD_LEASE_SECONDS', 900)
+    claimable = model.objects.filter(status__in=model.PENDING_STATUSES).filter(
+        Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+    )
+    # Highest priority first, which the pending index serves without a sort
+    ids = list(claimable.order_by("-priority", "id").values_list("id", flat=True)[:getattr(settings, 'UPLOAD_BATCH_SIZE', 50)])
+
+    with transaction.atomic():
+        # Rows another run claimed since the SELECT no longer match and are skipped
+        claimable.filter(id__in=ids).update(
+            lease_token=token,
+            lease_expires_at=now + datetime.timedelta(seconds=lease_seconds),
+        )
+    return token, list(model.objects.filter(lease_token=token).order_by("-priority", "id"))
+
+def renew_lease(model, item_id, lease_token):
+    """
+    Extend the lease on one claimed item by another UPLOAD_LEASE_SECONDS.
+
+    Called before each stage of an item's upload. A single claim-time lease
+    can't cover a whole batch, since generation alone may take minutes per
+    item. A lease that ran out is still renewed as long as no other run has
+    reclaimed the item.
+
+    Returns:
+        bool: False if another run holds the item now and this one should leave it
+    """
+    lease_seconds = getattr(settings, 'UPLOAD_LEASE_SECONDS', 900)
+    return bool(model.objects.filter(id=item_id, lease_token=lease_token).update(
+        lease_expires_at=timezone.now() + datetime.timedelta(seconds=lease_seconds)
+    ))
+
+def by_priority(articles, videos):
+    """
+    Merge the claimed articles and videos, highest priority first.
+
+    Both lists are already sorted by priority, so this is a heap merge rather
+    than a full sort.
+    """
+    return list(heapq.merge(
+        (('article', article) for article in articles),
+        (('video', video) for video in videos),
+        key=lambda pair: -pair[1].priority,
+    ))
 
 class ContentUploader:
     """
@@ -20,12 +84,21 @@ class ContentUploader:
                    If None, print statements will be used.
         """
         self.logger = logger
-        self.bsky_client = BlueSkyClient(
-            pds_url=pds_url,
-            username=username,
-            password=password,
-            session_string=session_string
-        )
+        self.routing = []
+        self.pds_url = pds_url
+        self.credentials = {"username": username, "password": password, "session_string": session_string}
+        # Queueing posts doesn't need Bluesky, the client is only created to send them
+        self.queue = PostQueue(None, logger=logger)
+    
+    @property
+    def bsky_client(self):
+        """Bluesky client for sending, the worker's shared one unless credentials were given."""
+        if self.queue.bsky_client is None:
+            if any(self.credentials.values()):
+                self.queue.bsky_client = BlueSkyClient(pds_url=self.pds_url, **self.credentials)
+            else:
+                self.queue.bsky_client = get_client(self.pds_url)
+        return self.queue.bsky_client
     
     def log_info(self, message):
         """Log an informational message."""
@@ -41,90 +114,180 @@ class ContentUploader:
         else:
             print(f"ERROR: {message}")
     
+    def _record_routing(self, item, result):
+        """Keep the routing decision for an LLM call so it shows up in the task result."""
+        self.routing.append({
+            "title": item.title,
+            "latency": round(result["latency"], 3),
+            **result["routing"],
+        })
+    
     def upload_all(self):
         """Main method to upload all new articles and videos."""
-        with transaction.atomic():
-            # Fetch new articles and videos that are marked as 'is_new'
-            new_articles = list(Article.objects.filter(is_new=True).select_for_update())
-            new_videos = list(Video.objects.filter(is_new=True).select_for_update())
-
-            # Mark items as processing (set `is_new` to False) to avoid duplicates
-            for article in new_articles:
-                article.is_new = False
-                article.save()
-
-            for video in new_videos:
-                video.is_new = False
-                video.save()
-
-            # If no new articles or videos, we return early
-            if not new_articles and not new_videos:
-                self.log_info("No new articles or videos to upload.")
-                return "No new articles or videos to upload."
-
-            # Combine the lists of articles and videos, alternating between them
-            combined_items = []
-            max_items = max(len(new_articles), len(new_videos))
-
-            for i in range(max_items):
-                if i < len(new_articles):
-                    combined_items.append(('article', new_articles[i]))
-                if i < len(new_videos):
-                    combined_items.append(('video', new_videos[i]))
-
-            # Process items in alternating order
-            for item_type, item in combined_items:
-                if item_type == 'article':
-                    self.upload_article(item)
-                else:
-                    self.upload_video(item)
-
-            return f"Uploaded {len(new_articles)} articles and {len(new_videos)} videos."
-    
-    def upload_article(self, article: Article):
-        """Uploads an article to Bluesky"""
+        article_lease, new_articles = claim_items(Article)
+        video_lease, new_videos = claim_items(Video)
+
+        # Queue items in alternating order
+        for item_type, item in by_priority(new_articles, new_videos):
+            lease_token = article_lease if item_type == 'article' else video_lease
+            if not renew_lease(type(item), item.id, lease_token):
+                self.log_error(f"Lease on '{item.title}' was taken over by another run, skipping it")
+                continue
+            if item_type == 'article':
+                self.upload_article(item, lease_token)
+            else:
+                self.upload_video(item, lease_token)
+
+        # Queued jobs survive a failed or interrupted run and are sent by the next one
+        login_stats = self.bsky_client.login_stats
+        queue_report = self.queue.drain()
+
+        attempted = queue_report["sent"] + queue_report["recovered"] + queue_report["retrying"] + queue_report["failed"]
+        if not new_articles and not new_videos and not attempted:
+            self.log_info("No new articles or videos to upload.")
+            message = "No new articles or videos to upload."
+        else:
+            message = (
+                f"Queued {len(new_articles)} articles and {len(new_videos)} videos, "
+                f"sent {queue_report['sent']} posts ({queue_report['recovered']} already posted, "
+                f"{queue_report['retrying']} retrying, {queue_report['failed']} failed)."
+            )
+
+        return {
+            "message": message,
+            "routing": self.routing,
+            "posts": queue_report["posts"],
+            "queue": queue_report,
+            "backend_health": llm.get_router().health(),
+            "login": login_stats,
+        }
+
+    def queue_item(self, item_type, item, lease_token):
+        """
+        Queue the post for one leased item of a per-item chain.
+
+        The chain's generate stage already ran, so the LLM is never called here;
+        an item it couldn't generate text for is posted with its title. Sending
+        is left to the single-flight drain_post_queue, so posts go out through
+        one client and rate limit.
+
+        Returns:
+            PostJob, or None if it couldn't be queued
+        """
+        upload = self.upload_article if item_type == "article" else self.upload_video
+        return upload(item, lease_token, generate=False)
+
+    def upload_article(self, article: Article, lease_token=None, generate=True):
+        """
+        Generates text for an article and queues its post, returning the PostJob.
+
+        With generate=False an article without pre-generated text is posted with its title.
+        """
         try:
             self.log_info(f"Starting upload for article: {article.title}")
-            self.log_info(f"Contacting Ollama LLM service...")
-            
-            # Time the LLM call
-            start_time = datetime.datetime.now()
-            text = llm.send_request(article.title, article.description)
-            end_time = datetime.datetime.now()
             
-            self.log_info(f"LLM response received in {(end_time - start_time).total_seconds():.2f} seconds")
-            self.log_info(f"Generated text: {text[:100]}...")
+            if article.generated_text:
+                # Text was pre-generated after scraping
+                text = article.generated_text
+                self.log_info(f"Using pre-generated text from {article.generated_model}")
+            elif not generate:
+                text = None
+                self.log_info("No generated text, posting the title")
+            else:
+                self.log_info("Contacting Ollama LLM service...")
+                
+                result = llm.generate(article.title, article.description)
+                text = result["text"]
+                self._record_routing(article, result)
+                
+                self.log_info(f"LLM response received from {result['backend']} in {result['latency']:.2f} seconds")
+            self.log_info(f"Generated text: {(text or '')[:100]}...")
             
-            # Continue with upload
-            self.bsky_client.upload_content(
+            # Queue the post, it is sent when the queue is drained
+            queued = self._queue_item(
+                "article",
+                article,
+                lease_token,
                 text=text if text else article.title,
-                title=article.title,
                 link=article.link,
                 description=article.description,
-                img_url=article.img_url
+                img_url=article.img_url,
+                # The prefetch already found no usable image, don't download it again
+                thumbnail=article.thumb_status != "failed"
             )
-            self.log_info(f"Successfully uploaded article: {article.title} at {datetime.datetime.now()}")
+            if queued:
+                self.log_info(f"Queued article: {article.title} at {datetime.datetime.now()}")
+            return queued
         except Exception as e:
             import traceback
             self.log_error(f"Error uploading article '{article.title}': {str(e)}")
             self.log_error(traceback.format_exc())
+            self._release(article, lease_token, e)
 
-    def upload_video(self, video: Video):
-        """Uploads a video to Bluesky"""
+    def upload_video(self, video: Video, lease_token=None, generate=True):
+        """
+        Generates text for a video and queues its post, returning the PostJob.
+
+        With generate=False a video without pre-generated text is posted with its description.
+        """
         try:
             # Check if the video URL is a YouTube URL and extract the ID
-            video_id = self.bsky_client.is_youtube_url(video.embed_url)
+            video_id = BlueSkyClient.is_youtube_url(video.embed_url)
 
-            # Use Llama to generate text for the video, passing description if available
-            text = llm.send_request(video.title, video.description if hasattr(video, 'description') else "", highlight=True)
+            # Use pre-generated text, or Llama to generate text for the video, passing description if available
+            if video.generated_text:
+                text = video.generated_text
+            elif not generate:
+                text = None
+            else:
+                result = llm.generate(video.title, video.description if hasattr(video, 'description') else "", highlight=True)
+                text = result["text"]
+                self._record_routing(video, result)
 
-            self.bsky_client.upload_content(
+            queued = self._queue_item(
+                "video",
+                video,
+                lease_token,
                 text=text if text else video.description,
-                title=video.title,
                 link=f"https://www.youtube.com/watch?v={video_id}",
                 description="",
-                img_url=video.img_url
+                img_url=video.img_url,
+                thumbnail=video.thumb_status != "failed"
             )
-            self.log_info(f"Successfully uploaded video: {video.title} at {datetime.datetime.now()}")
+            if queued:
+                self.log_info(f"Queued video: {video.title} at {datetime.datetime.now()}")
+            return queued
         except Exception as e:
-            self.log_error(f"Error uploading video '{video.title}': {e}")
\ No newline at end of file
+            self.log_error(f"Error uploading video '{video.title}': {e}")
+            self._release(video, lease_token, e)
+
+    def _queue_item(self, item_type, item, lease_token, **post):
+        """
+        Queue the post for a leased item and mark it done in one short transaction.
+
+        Returns:
+            PostJob, or None if the lease expired and another run reclaimed the item
+        """
+        with transaction.atomic():
+            done = type(item).objects.filter(id=item.id, lease_token=lease_token).update(
+                status="queued", is_new=False, lease_token=None, lease_expires_at=None
+            )
+            if not done:
+                self.log_error(f"Lease on '{item.title}' expired before it was queued, leaving it to the new holder")
+                return None
+            return self.queue.enqueue(item_type, item, **post)
+
+    def _release(self, item, lease_token, error):
+        """
+        Give up the lease on an item that failed so the next run can pick it up.
+
+        Items that keep failing are marked failed after POST_MAX_ATTEMPTS.
+        """
+        attempts = item.attempts + 1
+        type(item).objects.filter(id=item.id, lease_token=lease_token).update(
+            attempts=attempts,
+            last_error=str(error)[:500],
+            status="failed" if attempts >= self.queue.max_attempts else item.status,
+            lease_token=None,
+            lease_expires_at=None,
+        )
\ No newline at end of file
@@ -1,34 +1,89 @@
-from atproto_client.models.app.bsky.embed.video import Main
-from atproto_client.models.app.bsky.embed.external import External, Main
-from atproto import Client, client_utils
-import requests
+from app.utils import session_store
+from app.utils.thumbnails import get_thumbnail_blob, invalidate_thumbnail
+from app.utils.rate_limit import RateLimit
+from django.conf import settings
+from functools import lru_cache
+import logging
+import time
 import os
 import re
 
+logger = logging.getLogger(__name__)
+
 
 class BlueSkyClient:
+    """
+    Thin wrapper around the atproto Client for posting to Bluesky.
+    
+    atproto builds its full model tree on import, so it is only loaded when a
+    client is actually created.
+    """
 
     def __init__(self, pds_url: str, *, username: str=None, password: str=None, session_string: str=None):
         pds_host = pds_url
         user = username if username else os.getenv('USERNAME')
         pwd = password if password else os.getenv('PASSWORD')
 
-        self.client = Client(pds_host)
+        self.pds_url = pds_host
+        self.handle = user
+        self.login_stats = {"method": None, "password_logins": 0, "refreshes": 0, "login_seconds": 0.0}
 
-        if session_string:
-            try:
-                self.client.login(session_string=session_string)
-            except Exception as e:
-                print(f"Failed to authenticate with session string: {str(e)}")
-                session_string = None
+        self.rate_limit = RateLimit(
+            reserve=getattr(settings, 'POST_RATE_LIMIT_RESERVE', 5),
+            min_interval=getattr(settings, 'POST_MIN_INTERVAL', 1.0),
+        )
+        self.dedupe_scan_limit = getattr(settings, 'POST_DEDUPE_SCAN_LIMIT', 100)
+        self.dedupe_cache_seconds = getattr(settings, 'POST_DEDUPE_CACHE_SECONDS', 30)
+        self._recent_posts = None
+        self._recent_posts_at = 0.0
 
-        if not session_string:
-            try:
-                self.client.login(user, pwd)
-            except Exception as e:
-                raise ValueError(f"Could not authenticate with the provided credentials {str(e)}")
+        self.client = _client_class()(pds_host)
+        self.client.rate_limit = self.rate_limit
+        # Save every new or refreshed session so the next run can reuse it
+        self.client.on_session_change(self._on_session_change)
+
+        start_time = time.perf_counter()
+        try:
+            # An explicit session string wins, otherwise reuse the one saved by the last run
+            stored = session_string or session_store.load_session(self.pds_url, self.handle)
+            if stored and self._login_with_session(stored):
+                self.login_stats["method"] = "session"
+            else:
+                try:
+                    self.client.login(user, pwd)
+                except Exception as e:
+                    raise ValueError(f"Could not authenticate with the provided credentials {str(e)}")
+                self.login_stats["method"] = "password"
+                self.login_stats["password_logins"] += 1
+        finally:
+            self.login_stats["login_seconds"] = round(time.perf_counter() - start_time, 3)
+        logger.info(f"Bluesky login via {self.login_stats['method']} in {self.login_stats['login_seconds']:.2f} seconds")
+
+    def _login_with_session(self, session_string: str):
+        """
+        Resume a saved session, refreshing its tokens if they expired.
+        
+        Returns:
+            bool: False if the session was rejected and a password login is needed
+        """
+        try:
+            self.client.login(session_string=session_string)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to authenticate with session string: {str(e)}")
+            session_store.clear_session(self.pds_url, self.handle)
+            return False
+
+    def _on_session_change(self, event, session):
+        """atproto callback fired when a session is created, refreshed or imported."""
+        from atproto import SessionEvent
+
+        if event == SessionEvent.REFRESH:
+            self.login_stats["refreshes"] += 1
+        if event in (SessionEvent.CREATE, SessionEvent.REFRESH):
+            session_store.save_session(self.pds_url, self.handle, session.export())
             
-    def upload_content(self, text: str, title: str, link: str, description: str = "", img_url: str = None):
+    def upload_content(self, text: str, title: str, link: str, description: str = "", img_url: str = None, thumbnail: bool = True):
         """
         Uploads a post to Bluesky with an external embed, supporting both articles and YouTube videos.
         
@@ -37,60 +92,125 @@ class BlueSkyClient:
         :param link: The URL of the external content.
         :param description: Description for the external content.
         :param img_url: The URL of the image to be used as a thumbnail (only for non-YouTube embeds).
+        :param thumbnail: Set to False to post without a thumbnail, e.g. when the prefetch found none.
+        :return: Dict with the post URI and how the thumbnail was obtained.
         """
+        from atproto_client.models.app.bsky.embed.external import External, Main
+
+        start_time = time.perf_counter()
         _, hashtags = self._extract_hashtags(text)
         text_builder = self._build_text(text, hashtags)
         
-        # Check if it's a YouTube video
-        video_id = self.is_youtube_url(link)
+        uri = self.embed_uri(link)
+        thumb_url = self.thumbnail_url(link, img_url) if thumbnail else None
 
-        if video_id:
-            # For YouTube videos, generate a thumbnail URL
-            youtube_thumb_url = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
-            
-            # Download the thumbnail
+        blob = None
+        thumb_info = {"url": thumb_url, "cache": None}
+        if thumb_url:
             try:
-                headers = {'User-Agent': 'Mozilla/5.0'}
-                response = requests.get(youtube_thumb_url, headers=headers, timeout=10)
-                if response.status_code == 200 and response.headers.get('Content-Type', '').startswith('image/'):
-                    blob = self.client.upload_blob(response.content)
+                blob, thumb_info = get_thumbnail_blob(self.client, thumb_url)
             except Exception as e:
-                print(f"Error downloading YouTube thumbnail: {e}")
-                blob = None
-                
-            embed_external = External(
-                title=title,
-                description=description,
-                uri=f"https://www.youtube.com/watch?v={video_id}",
-                thumb=blob.blob if blob else None
-            )
-        else:
-            # Regular external embed with an optional image
-            blob = None
-            if img_url:
-                try:
-                    headers = {'User-Agent': 'Mozilla/5.0'}
-                    response = requests.get(img_url, headers=headers, timeout=10)
-                    if response.status_code == 200 and response.headers.get('Content-Type', '').startswith('image/'):
-                        blob = self.client.upload_blob(response.content)
-                except Exception as e:
-                    print(f"Error downloading image: {e}")
+                logger.warning(f"Error preparing thumbnail {thumb_url}: {e}")
 
-            embed_external = External(
+        def build_embed(thumb):
+            embed = Main(external=External(
                 title=title,
                 description=description,
-                uri=link,
-                thumb=blob.blob if blob else None
+                uri=uri,
+                thumb=thumb
+            ))
+            try:
+                return embed.model_dump(by_alias=True)
+            except AttributeError:
+                return embed.dict(by_alias=True)
+
+        try:
+            try:
+                response = self.client.send_post(text=text_builder, embed=build_embed(blob))
+            except Exception as e:
+                if thumb_info["cache"] not in ("url", "content") or "blob" not in str(e).lower():
+                    raise
+                # A reused blob may have been garbage collected by the PDS, upload it again once
+                logger.warning(f"Post with cached thumbnail failed ({e}), retrying with a fresh upload")
+                invalidate_thumbnail(thumb_url)
+                blob, thumb_info = get_thumbnail_blob(self.client, thumb_url)
+                response = self.client.send_post(text=text_builder, embed=build_embed(blob))
+        except Exception:
+            # The post may have been created before the error, the next dedupe check has to rescan
+            self._recent_posts = None
+            raise
+
+        if self._recent_posts is not None:
+            self._recent_posts.setdefault(uri, response.uri)
+        return {"uri": response.uri, "thumbnail": thumb_info, "seconds": round(time.perf_counter() - start_time, 3)}
+
+    def find_post(self, link: str):
+        """
+        Look for a post of link among our own recent posts.
+
+        Used before retrying a post whose earlier attempt failed ambiguously,
+        e.g. timed out after the PDS had already created the record.
+
+        Returns:
+            str or None: The URI of the existing post
+        """
+        return self.recent_posts().get(self.embed_uri(link))
+
+    def recent_posts(self):
+        """
+        Map the link card URIs of our last POST_DEDUPE_SCAN_LIMIT posts to their post URIs.
+
+        The scan is cached for POST_DEDUPE_CACHE_SECONDS, so a drain retrying
+        several posts reads the feed once.
+        """
+        if self._recent_posts is not None and time.monotonic() - self._recent_posts_at < self.dedupe_cache_seconds:
+            return self._recent_posts
+
+        posts = {}
+        cursor = None
+        remaining = self.dedupe_scan_limit
+        while remaining > 0:
+            response = self.client.get_author_feed(
+                actor=self.client.me.did,
+                cursor=cursor,
+                filter="posts_no_replies",
+                limit=min(remaining, 100),
             )
+            for feed_view in response.feed:
+                if feed_view.reason is not None:
+                    # A repost of someone else's post
+                    continue
+                embed = getattr(feed_view.post.record, 'embed', None)
+                external = getattr(embed, 'external', None)
+                if external is not None:
+                    # Newest first, keep the latest post of each link
+                    posts.setdefault(external.uri, feed_view.post.uri)
+            remaining -= len(response.feed)
+            cursor = response.cursor
+            if not cursor or not response.feed:
+                break
 
-        embed = Main(external=embed_external)
+        self._recent_posts = posts
+        self._recent_posts_at = time.monotonic()
+        return posts
 
-        try:
-            embed_data = embed.model_dump(by_alias=True)
-        except AttributeError:
-            embed_data = embed.dict(by_alias=True)
+    @classmethod
+    def embed_uri(cls, link: str):
+        """The URI a link card for link points to, YouTube videos get a canonical watch URL."""
+        video_id = cls.is_youtube_url(link)
+        return f"https://www.youtube.com/watch?v={video_id}" if video_id else link
 
-        self.client.send_post(text=text_builder, embed=embed_data)
+    @staticmethod
+    def thumbnail_url(link: str, img_url: str = None):
+        """
+        Return the image to use as a link card thumbnail.
+        
+        YouTube links use the video's hqdefault image, other links use img_url.
+        """
+        video_id = BlueSkyClient.is_youtube_url(link)
+        if video_id:
+            return f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+        return img_url
 
     def _extract_hashtags(self, content):
         """
@@ -130,6 +250,8 @@ class BlueSkyClient:
         Returns:
             TextBuilder: A TextBuilder instance with the content and tags
         """
+        from atproto import client_utils
+
         builder = client_utils.TextBuilder()
         
         # Remove existing hashtags from content since we'll add them properly later
@@ -152,7 +274,8 @@ class BlueSkyClient:
         
         return builder
 
-    def is_youtube_url(self, url):
+    @staticmethod
+    def is_youtube_url(url):
         """
         Checks if the given URL is a YouTube video and extracts the video ID.
         
@@ -164,4 +287,43 @@ class BlueSkyClient:
         """
         youtube_regex = r"(?:https?:\/\/)?(?:www\.)?(?:youtube\.com\/(?:watch\?v=|embed\/|v\/)|youtu\.be\/)([\w-]+)"
         match = re.search(youtube_regex, url)
-        return match.group(1) if match else None
\ No newline at end of file
+        return match.group(1) if match else None
+
+
+@lru_cache(maxsize=None)
+def get_client(pds_url: str):
+    """
+    The BlueSkyClient of this worker process, logged in on first use.
+
+    Tasks share it, so a worker logs in and refreshes its session once rather
+    than per task, and its sends are spaced by a single RateLimit.
+    """
+    return BlueSkyClient(pds_url=pds_url)
+
+
+@lru_cache(maxsize=None)
+def _client_class():
+    """
+    atproto Client that feeds the rate-limit headers of every response into a RateLimit.
+
+    Built on first use so atproto is only imported when a client is created.
+    """
+    from atproto import Client
+
+    class RateLimitedClient(Client):
+        rate_limit = None
+
+        def _invoke(self, invoke_type, **kwargs):
+            endpoint = kwargs.get('url', '').rsplit('/', 1)[-1]
+            try:
+                response = super()._invoke(invoke_type, **kwargs)
+            except Exception as e:
+                error_response = getattr(e, 'response', None)
+                if self.rate_limit is not None and error_response is not None:
+                    self.rate_limit.update(endpoint, error_response.headers, error_response.status_code)
+                raise
+            if self.rate_limit is not None:
+                self.rate_limit.update(endpoint, response.headers, response.status_code)
+            return response
+
+    return RateLimitedClient
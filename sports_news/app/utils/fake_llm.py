@@ -0,0 +1,190 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timezone
+import threading
+import random
+import json
+import time
+
+FAKE_WORDS = (
+    "What a night on the ice 🚨 The home side took control early and never looked back "
+    "as the power play clicked again #NHL #HockeyNight"
+).split()
+
+
+class FakeLLMServer:
+    """
+    A local stand-in for Ollama and OpenAI-compatible APIs used for benchmarking.
+
+    Serves /api/generate and /api/tags like Ollama, and */chat/completions like the
+    OpenAI API, both streaming and non-streaming. Tokens are emitted at a fixed
+    rate after a fixed prompt-processing delay, and a configurable share of requests
+    fail with HTTP 500.
+
+    Attributes:
+        tokens_per_sec (float): Generation speed of the fake model
+        failure_rate (float): Probability (0-1) that a request fails
+        prompt_delay (float): Seconds before the first token, simulating prompt processing
+        completion_tokens (int): Number of tokens generated per request
+    """
+
+    def __init__(self, *, tokens_per_sec=50.0, failure_rate=0.0, prompt_delay=0.2,
+                 completion_tokens=40, host="127.0.0.1", port=0, seed=None):
+        self.tokens_per_sec = tokens_per_sec
+        self.failure_rate = failure_rate
+        self.prompt_delay = prompt_delay
+        self.completion_tokens = completion_tokens
+        self.requests = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+            return failed
+
+    def tokens(self):
+        """Yield generated tokens, paced at tokens_per_sec after the prompt delay."""
+        time.sleep(self.prompt_delay)
+        interval = 1.0 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0
+        for i in range(self.completion_tokens):
+            time.sleep(interval)
+            word = FAKE_WORDS[i % len(FAKE_WORDS)]
+            yield word if i == 0 else f" {word}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _start_stream(self, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _end_stream(self):
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/api/tags":
+                    self._send_json(200, {"models": [{"name": "fake:latest", "details": {"parameter_size": "0B"}}]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                body = self._read_json()
+                if server.should_fail():
+                    self._send_json(500, {"error": "simulated failure"})
+                elif self.path.rstrip("/") == "/api/generate":
+                    self._ollama_generate(body)
+                elif self.path.rstrip("/").endswith("/chat/completions"):
+                    self._chat_completions(body)
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def _ollama_generate(self, body):
+                model = body.get("model", "fake")
+                prompt_tokens = len(body.get("prompt", "").split())
+                start = time.perf_counter()
+
+                def chunk(**fields):
+                    created = datetime.now(timezone.utc).isoformat()
+                    return {"model": model, "created_at": created, **fields}
+
+                final_fields = dict(
+                    done=True,
+                    done_reason="stop",
+                    prompt_eval_count=prompt_tokens,
+                    eval_count=server.completion_tokens,
+                )
+
+                if body.get("stream", True):
+                    self._start_stream("application/x-ndjson")
+                    for token in server.tokens():
+                        self._write_chunk(json.dumps(chunk(response=token, done=False)).encode() + b"\n")
+                    final = chunk(response="", total_duration=int((time.perf_counter() - start) * 1e9), **final_fields)
+                    self._write_chunk(json.dumps(final).encode() + b"\n")
+                    self._end_stream()
+                else:
+                    text = "".join(server.tokens())
+                    self._send_json(200, chunk(response=text, total_duration=int((time.perf_counter() - start) * 1e9), **final_fields))
+
+            def _chat_completions(self, body):
+                model = body.get("model", "fake")
+                prompt = " ".join(m.get("content", "") for m in body.get("messages", []))
+                usage = {
+                    "prompt_tokens": len(prompt.split()),
+                    "completion_tokens": server.completion_tokens,
+                    "total_tokens": len(prompt.split()) + server.completion_tokens,
+                }
+                base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": model}
+
+                if body.get("stream"):
+                    self._start_stream("text/event-stream")
+                    for token in server.tokens():
+                        event = {**base, "object": "chat.completion.chunk",
+                                 "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                        self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                    if (body.get("stream_options") or {}).get("include_usage"):
+                        event = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}
+                        self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self._end_stream()
+                else:
+                    text = "".join(server.tokens())
+                    self._send_json(200, {
+                        **base,
+                        "object": "chat.completion",
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                        "usage": usage,
+                    })
+
+        return Handler
@@ -1,94 +1,142 @@
-from langchain_ollama.llms import OllamaLLM
-from openai import OpenAI
-from app.utils.prompts import get_prompt
-import psutil
+from app.utils.prompts import get_prompt, get_prompt_variables
+from app.utils.llm_router import Backend, LLMRouter
+from functools import lru_cache
 import requests
+import logging
+import json
 import time
 import os
 
+logger = logging.getLogger(__name__)
+
 OLLAMA_MODEL = "mistral"
 LLAMA_API_MODEL = "llama3-70b"
+OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', "http://localhost:11434")
+LLAMA_API_BASE_URL = os.getenv('LLAMA_API_BASE_URL', "https://api.llmapi.com/")
+
+_router = None
+
+def get_router():
+    """Return the process-wide router so backend health is tracked across requests."""
+    global _router
+    if _router is None:
+        _router = LLMRouter([
+            Backend("ollama_langchain", OLLAMA_MODEL, _call_langchain, group="ollama", min_memory_gb=6.0),
+            Backend("llama_api", LLAMA_API_MODEL, _call_api, group="api",
+                    enabled=lambda: bool(os.getenv('LLAMA_API_TOKEN'))),
+            Backend("ollama_direct", OLLAMA_MODEL, _call_direct, group="ollama"),
+        ], hedge_after=float(os.getenv('LLM_HEDGE_AFTER', 60)), on_call=record_call)
+    return _router
 
 def send_request(title: str, subtitle: str = "", body: str = "", highlight: bool = False):
-    print(f"=== LLM REQUEST DEBUG ===")
-    print(f"Time: {time.ctime()}")
-    
-    # Check available memory before proceeding
-    available_mem_gb = psutil.virtual_memory().available / (1024 * 1024 * 1024)
-    print(f"Available memory: {available_mem_gb:.2f} GB")
-    
-    if available_mem_gb < 6.0:  # Require at least 6GB to be safe
-        print(f"WARNING: Not enough memory available ({available_mem_gb:.2f} GB)")
-        print("Falling back to direct method...")
-        try:
-            result = send_api_request(title, subtitle, highlight)
-            if not result:
-                raise Exception("API request failed")
-            else:
-                return result
-        except:
-            return send_request_direct(title, subtitle, highlight)
+    return generate(title, subtitle, highlight)["text"]
+
+def generate(title: str, subtitle: str = "", highlight: bool = False):
+    """
+    Generate post text on the best healthy backend.
     
-    print(f"Title: {title}")
-    print(f"Subtitle: {subtitle[:50]}...")
-    print(f"Highlight: {highlight}")
+    Returns:
+        dict: text (None on failure), model, backend, latency in seconds and
+              the routing decision
+    """
+    return get_router().route(title, subtitle, highlight)
+
+def send_request_langchain(title: str, subtitle: str = "", highlight: bool = False):
+    return _call_langchain(title, subtitle, highlight)["text"]
+
+def send_api_request(title: str, subtitle: str, highlight: bool = False):
+    return _call_api(title, subtitle, highlight)["text"]
+
+def send_request_direct(title: str, subtitle: str = "", highlight: bool = False):
+    """Direct implementation without using LangChain"""
+    return _call_direct(title, subtitle, highlight)["text"]
+
+def _call_result(text=None, prompt_chars=0, prompt_tokens=None, completion_tokens=None, ttft=None, error=""):
+    """Common shape returned by every backend call and recorded as an LLMCall."""
+    return {
+        "text": text,
+        "prompt_chars": prompt_chars,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "ttft": ttft,
+        "error": error,
+    }
+
+@lru_cache(maxsize=None)
+def _first_token_timer_class():
+    """Build the LangChain callback class on first use so langchain is only imported when needed."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class FirstTokenTimer(BaseCallbackHandler):
+        """LangChain callback that records when the first streamed token arrives."""
+
+        def __init__(self):
+            self.start_time = time.perf_counter()
+            self.ttft = None
+
+        def on_llm_new_token(self, token, **kwargs):
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - self.start_time
+
+    return FirstTokenTimer
+
+def _call_langchain(title: str, subtitle: str = "", highlight: bool = False):
+    logger.debug(f"LangChain request: title={title!r} subtitle={subtitle[:50]!r} highlight={highlight}")
+    prompt_chars = 0
     
     try:
+        from langchain_ollama.llms import OllamaLLM
+        
         # Create the Ollama LLM instance
-        print("Creating OllamaLLM instance...")
         llm = OllamaLLM(
             model=OLLAMA_MODEL, 
-            base_url="http://localhost:11434",
+            base_url=OLLAMA_BASE_URL,
             temperature=0.3,
             max_tokens=250,
             request_timeout=600.0  # 10 minutes timeout
         )
         
-        # Define prompt template
-        print("Getting prompt template...")
-        prompt = get_prompt(title, subtitle, highlight)
-        print(f"Prompt template ready (length: {len(str(prompt))})")
+        # Fill the compiled prompt template
+        build_start = time.perf_counter()
+        prompt = get_prompt(highlight)
+        prompt_vars = get_prompt_variables(title, subtitle, highlight)
+        prompt_text = prompt.format(**prompt_vars)
+        prompt_chars = len(prompt_text)
+        build_ms = (time.perf_counter() - build_start) * 1000
+        logger.debug(f"Prompt ready (length: {prompt_chars} chars, built in {build_ms:.2f} ms)")
         
-        # Use the modern pipe syntax
-        print("Creating chain...")
-        chain = prompt | llm
-        
-        # Run the chain with the input values
-        print(f"Invoking chain at {time.ctime()}...")
-        result = chain.invoke({"title": title, "subtitle": subtitle})
-        print(f"Chain response received at {time.ctime()}")
+        # Run the prompt text through the model, timing the first streamed token
+        timer = _first_token_timer_class()()
+        generation = llm.generate([prompt_text], callbacks=[timer]).generations[0][0]
+        info = generation.generation_info or {}
         
         # Post-process
-        clean_result = result.strip()
-        print(f"Result cleaned, length: {len(clean_result)}")
+        clean_result = generation.text.strip()
         
         # If result is too long, truncate to 200 characters
         if len(clean_result) > 200:
             clean_result = clean_result[:197] + "..."
-            print("Result truncated to 200 chars")
+            logger.debug("Result truncated to 200 chars")
             
-        print("=== LLM REQUEST COMPLETE ===")
-        return clean_result
+        return _call_result(
+            text=clean_result,
+            prompt_chars=prompt_chars,
+            prompt_tokens=info.get("prompt_eval_count"),
+            completion_tokens=info.get("eval_count"),
+            ttft=timer.ttft,
+        )
     except Exception as e:
-        print(f"=== LLM REQUEST FAILED ===")
-        print(f"Error: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        print("=== END ERROR ===")
-        return None
+        logger.warning(f"LangChain request failed: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
+        return _call_result(prompt_chars=prompt_chars, error=str(e))
     
-def send_api_request(title: str, subtitle: str, highlight: bool = False):
-    print(f"=== API REQUEST DEBUG ===")
-    print(f"Time: {time.ctime()}")
-    print(f"Title: {title}")
-    print(f"Subtitle: {subtitle[:50]}...")
-    print(f"Highlight: {highlight}")
+def _call_api(title: str, subtitle: str, highlight: bool = False):
+    logger.debug(f"API request: title={title!r} subtitle={subtitle[:50]!r} highlight={highlight}")
 
     # Check if API token is available
     api_token = os.getenv('LLAMA_API_TOKEN')
     if not api_token:
-        print("WARNING: LLAMA_API_TOKEN not found in environment variables")
-        return None
+        logger.warning("LLAMA_API_TOKEN not found in environment variables")
+        return _call_result(error="LLAMA_API_TOKEN not set")
 
     requirements = (
         " - MUST BE NO MORE THAN 250 CHARACTERS TOTAL"
@@ -102,9 +150,11 @@ def send_api_request(title: str, subtitle: str, highlight: bool = False):
         " - DO NOT include any placeholders or quotations around the outputted text"
     )
 
+    from openai import OpenAI
+
     client = OpenAI(
         api_key = api_token,
-        base_url = "https://api.llmapi.com/"
+        base_url = LLAMA_API_BASE_URL
     )
 
     if highlight:
@@ -120,14 +170,15 @@ def send_api_request(title: str, subtitle: str, highlight: bool = False):
             f"{requirements}"
             )
     
-    print(f"Constructed prompt (length: {len(prompt)})")
-    print(f"Using model: {LLAMA_API_MODEL}")
+    logger.debug(f"Constructed prompt (length: {len(prompt)}) for model {LLAMA_API_MODEL}")
         
     try:
-        print(f"Sending API request at {time.ctime()}...")
-        start_time = time.time()
+        start_time = time.perf_counter()
+        ttft = None
+        usage = None
+        parts = []
         
-        chat_completion = client.chat.completions.create(
+        stream = client.chat.completions.create(
             messages = [
                 {
                     "role": "user",
@@ -135,37 +186,40 @@ def send_api_request(title: str, subtitle: str, highlight: bool = False):
                 }
             ],
             model=LLAMA_API_MODEL,
-            stream=False
+            stream=True,
+            stream_options={"include_usage": True}
         )
         
-        end_time = time.time()
-        print(f"Response received in {end_time - start_time:.2f} seconds")
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                if ttft is None:
+                    ttft = time.perf_counter() - start_time
+                parts.append(chunk.choices[0].delta.content)
+            # The final chunk carries token usage and no choices
+            if chunk.usage:
+                usage = chunk.usage
         
-        result = chat_completion.choices[0].message.content
-        clean_result = result.strip()
+        logger.debug(f"API response received in {time.perf_counter() - start_time:.2f} seconds")
         
-        print(f"Result cleaned, length: {len(clean_result)}")
+        clean_result = "".join(parts).strip()
         
         if len(clean_result) > 250:
             clean_result = clean_result[:247] + "..."
-            print("Result truncated to 250 chars")
+            logger.debug("Result truncated to 250 chars")
             
-        print(f"Generated text: {clean_result[:50]}...")
-        print("=== API REQUEST COMPLETE ===")
-        
-        return clean_result
+        return _call_result(
+            text=clean_result,
+            prompt_chars=len(prompt),
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            ttft=ttft,
+        )
     except Exception as e:
-        print(f"=== API REQUEST FAILED ===")
-        print(f"Error: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        print("=== END ERROR ===")
-        return None
+        logger.warning(f"API request failed: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
+        return _call_result(prompt_chars=len(prompt), error=str(e))
 
-def send_request_direct(title: str, subtitle: str = "", highlight: bool = False):
-    """Direct implementation without using LangChain"""
-    
-    print(f"Starting direct Ollama request at {time.ctime()}")
+def _call_direct(title: str, subtitle: str = "", highlight: bool = False):
+    logger.debug(f"Direct Ollama request: title={title!r} highlight={highlight}")
     
     # Create a simple prompt
     if highlight:
@@ -176,7 +230,7 @@ def send_request_direct(title: str, subtitle: str = "", highlight: bool = False)
     payload = {
         "model": OLLAMA_MODEL,
         "prompt": prompt,
-        "stream": False,
+        "stream": True,
         "options": {
             "temperature": 0.3,
             "num_predict": 250
@@ -184,41 +238,85 @@ def send_request_direct(title: str, subtitle: str = "", highlight: bool = False)
     }
     
     try:
-        start_time = time.time()
-        print(f"Sending direct API request to Ollama...")
+        start_time = time.perf_counter()
+        ttft = None
+        final = {}
+        parts = []
         
         response = requests.post(
-            "http://localhost:11434/api/generate",
+            f"{OLLAMA_BASE_URL}/api/generate",
             json=payload,
+            stream=True,
             timeout=600  # 10-minute timeout
         )
         
-        end_time = time.time()
-        print(f"Response received in {end_time - start_time:.2f} seconds")
+        if response.status_code != 200:
+            logger.warning(f"Direct Ollama request failed with status {response.status_code}: {response.text}")
+            return _call_result(prompt_chars=len(prompt), error=f"HTTP {response.status_code}")
         
-        if response.status_code == 200:
-            result = response.json().get("response", "")
-            # Clean up the result
-            clean_result = result.strip()
-            if len(clean_result) > 200:
-                clean_result = clean_result[:197] + "..."
-            
-            print(f"Generated text (length: {len(clean_result)}): {clean_result[:50]}...")
-            return clean_result
-        else:
-            print(f"Error status code: {response.status_code}")
-            print(f"Response: {response.text}")
-            return None
+        # Ollama streams one JSON object per line, the last one has done=true and the token counts
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("response"):
+                if ttft is None:
+                    ttft = time.perf_counter() - start_time
+                parts.append(chunk["response"])
+            if chunk.get("done"):
+                final = chunk
+        
+        logger.debug(f"Direct Ollama response received in {time.perf_counter() - start_time:.2f} seconds")
+        
+        # Clean up the result
+        clean_result = "".join(parts).strip()
+        if len(clean_result) > 200:
+            clean_result = clean_result[:197] + "..."
+        
+        return _call_result(
+            text=clean_result,
+            prompt_chars=len(prompt),
+            prompt_tokens=final.get("prompt_eval_count"),
+            completion_tokens=final.get("eval_count"),
+            ttft=ttft,
+        )
+    except Exception as e:
+        logger.warning(f"Direct Ollama request failed: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
+        return _call_result(prompt_chars=len(prompt), error=str(e))
+
+def record_call(backend, model, highlight, result, latency, queue_time):
+    """
+    Store one LLM call as an LLMCall row.
+    
+    Called by the router from its worker threads, so the thread's database
+    connection is closed afterwards. Failures to record never affect generation.
+    """
+    from app.models import LLMCall
+    from django.db import connection
+    
+    try:
+        LLMCall.objects.create(
+            backend=backend,
+            model=model,
+            highlight=highlight,
+            success=bool(result["text"]),
+            prompt_chars=result["prompt_chars"],
+            prompt_tokens=result["prompt_tokens"],
+            completion_tokens=result["completion_tokens"],
+            queue_time=queue_time,
+            ttft=result["ttft"],
+            latency=latency,
+            error=result["error"][:500],
+        )
     except Exception as e:
-        print(f"Direct API request failed: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        return None
+        logger.warning(f"Could not record LLM call metrics: {e}")
+    finally:
+        connection.close()
 
 def list_available_models():
     """List all available models in the local Ollama instance"""
     try:
-        response = requests.get("http://localhost:11434/api/tags")
+        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags")
         if response.status_code == 200:
             models = response.json().get("models", [])
             print("Available models:")
@@ -0,0 +1,272 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Backend:
+    """
+    A single LLM backend with rolling health statistics and a circuit breaker.
+
+    Attributes:
+        name (str): Identifier used in routing decisions
+        model (str): Model name reported for generated text
+        call (callable): Function taking (title, subtitle, highlight) and returning a dict
+                         with the generated text (None on failure) and call metrics
+        group (str): Backends in the same group share hardware and are never hedged against each other
+    """
+
+    def __init__(self, name, model, call, *, group=None, min_memory_gb=None, enabled=None,
+                 window=20, failure_threshold=3, cooldown=60.0, max_cooldown=900.0):
+        self.name = name
+        self.model = model
+        self.call = call
+        self.group = group or name
+        self.min_memory_gb = min_memory_gb
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.cooldown = cooldown
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def unavailable_reason(self):
+        """Return why this backend can't take a request right now, or None if it can."""
+        if self.enabled and not self.enabled():
+            return "disabled"
+
+        if self.min_memory_gb is not None:
+            import psutil
+            available_gb = psutil.virtual_memory().available / (1024 * 1024 * 1024)
+            if available_gb < self.min_memory_gb:
+                return f"low memory ({available_gb:.2f} GB)"
+
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return "circuit open"
+                # Cooldown elapsed, allow a single trial request
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == HALF_OPEN and self.trial_in_flight:
+                return "circuit half-open, trial in flight"
+        return None
+
+    def acquire(self):
+        """Mark a request as started; in half-open state only one trial is allowed."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.trial_in_flight = True
+
+    def record_success(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                logger.info(f"LLM backend {self.name}: circuit closed")
+            self.state = CLOSED
+            self.cooldown = self.base_cooldown
+            self.trial_in_flight = False
+
+    def record_failure(self, latency):
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                # Failed trial, back off further before trying again
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._open()
+            elif self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+            self.trial_in_flight = False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        logger.warning(f"LLM backend {self.name}: circuit opened for {self.cooldown:.0f}s")
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    def latency_percentile(self, pct):
+        with self._lock:
+            if not self._latencies:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def score(self):
+        """Expected cost of sending a request here; lower is better."""
+        p50 = self.latency_percentile(50)
+        if p50 is None:
+            # No history yet, try it so we learn its latency; only failures, try it last
+            return float("inf") if self._outcomes else 0.0
+        return p50 * (1 + 4 * self.error_rate)
+
+    def stats(self):
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate, 3),
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "samples": len(self._outcomes),
+        }
+
+
+class LLMRouter:
+    """
+    Routes each generation request to the best healthy backend.
+
+    Backends are ranked by rolling latency and error rate. If the chosen backend is
+    slower than its usual p95, a hedged request is sent to the next backend in a
+    different group and the first successful answer wins. Failures fall through to
+    the next backend in ranked order.
+    """
+
+    def __init__(self, backends, *, hedge_after=60.0, min_hedge_samples=5, on_call=None):
+        self.backends = backends
+        self.hedge_after = hedge_after
+        self.min_hedge_samples = min_hedge_samples
+        self.on_call = on_call
+
+    def _hedge_delay(self, backend):
+        p95 = backend.latency_percentile(95)
+        if p95 is None or backend.stats()["samples"] < self.min_hedge_samples:
+            return self.hedge_after
+        return max(p95, 1.0)
+
+    def _timed_call(self, backend, title, subtitle, highlight, routed_at):
+        """
+        Call one backend and record its outcome.
+
+        Queue time is measured from the router receiving the request, so for a
+        hedged or fallback attempt it covers the hedge delay or the attempts that
+        failed before it.
+        """
+        start_time = time.perf_counter()
+        queue_time = start_time - routed_at
+        try:
+            result = backend.call(title, subtitle, highlight)
+        except Exception as e:
+            logger.warning(f"LLM backend {backend.name} raised: {e}")
+            result = {"text": None, "prompt_chars": 0, "prompt_tokens": None,
+                      "completion_tokens": None, "ttft": None, "error": str(e)}
+        latency = time.perf_counter() - start_time
+
+        if result["text"]:
+            backend.record_success(latency)
+        else:
+            backend.record_failure(latency)
+
+        if self.on_call:
+            self.on_call(backend.name, backend.model, highlight, result, latency, queue_time)
+        return result, latency
+
+    def health(self):
+        """Return the health statistics of every backend."""
+        return {backend.name: backend.stats() for backend in self.backends}
+
+    def route(self, title: str, subtitle: str = "", highlight: bool = False):
+        """
+        Generate text using the best available backend.
+
+        Returns:
+            dict: text (None if every backend failed), model, backend, latency and
+                  the routing decision that produced it
+        """
+        start_time = time.perf_counter()
+        decision = {"backend": None, "candidates": [], "skipped": {}, "hedged": False, "attempts": []}
+
+        candidates = []
+        for backend in self.backends:
+            reason = backend.unavailable_reason()
+            if reason:
+                decision["skipped"][backend.name] = reason
+            else:
+                candidates.append(backend)
+        # sorted() is stable, so untried backends keep their configured order
+        candidates = sorted(candidates, key=lambda b: b.score())
+        decision["candidates"] = [backend.name for backend in candidates]
+
+        result = {"text": None, "model": None, "backend": None, "latency": 0.0, "routing": decision}
+        if not candidates:
+            logger.error(f"No healthy LLM backend available: {decision['skipped']}")
+            return result
+
+        queue = list(candidates)
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+
+        def launch(backend):
+            backend.acquire()
+            future = executor.submit(self._timed_call, backend, title, subtitle, highlight, start_time)
+            pending[future] = backend
+
+        try:
+            launch(queue.pop(0))
+            while pending:
+                running_groups = {backend.group for backend in pending.values()}
+                hedge_target = next((b for b in queue if b.group not in running_groups), None)
+                timeout = None
+                if not decision["hedged"] and hedge_target:
+                    primary = next(iter(pending.values()))
+                    timeout = self._hedge_delay(primary)
+
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # The primary is slow, race it against a backend on other hardware
+                    logger.info(f"LLM backend {primary.name} slower than {timeout:.1f}s, hedging with {hedge_target.name}")
+                    queue.remove(hedge_target)
+                    decision["hedged"] = True
+                    launch(hedge_target)
+                    continue
+
+                for future in done:
+                    backend = pending.pop(future)
+                    call, latency = future.result()
+                    text = call["text"]
+                    decision["attempts"].append({
+                        "backend": backend.name,
+                        "ok": bool(text),
+                        "latency": round(latency, 3),
+                        "ttft": round(call["ttft"], 3) if call["ttft"] is not None else None,
+                        "prompt_tokens": call["prompt_tokens"],
+                        "completion_tokens": call["completion_tokens"],
+                    })
+                    if text:
+                        result.update(text=text, model=backend.model, backend=backend.name)
+                        decision["backend"] = backend.name
+                        return result
+
+                if not pending and queue:
+                    launch(queue.pop(0))
+
+            logger.error(f"All LLM backends failed: {decision['attempts']}")
+            return result
+        finally:
+            result["latency"] = time.perf_counter() - start_time
+            # Don't wait for a losing hedged request, it records its own stats when it finishes
+            executor.shutdown(wait=False, cancel_futures=True)
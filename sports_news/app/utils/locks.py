@@ -0,0 +1,173 @@
+from django.conf import settings
+from functools import lru_cache, wraps
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """
+    Redis client for locks, on LOCK_REDIS_URL (the Celery broker by default).
+
+    Returns None when no Redis is configured, e.g. with an in-memory broker in
+    development, in which case tasks run without single-flight protection.
+    """
+    url = getattr(settings, 'LOCK_REDIS_URL', None) or ''
+    if not url.startswith(('redis://', 'rediss://', 'unix://')):
+        return None
+
+    import redis
+
+    return redis.Redis.from_url(url)
+
+class SingleFlightLock:
+    """
+    A Redis lock held by at most one run of a task, across all workers.
+
+    The lock is taken with a short lease that a heartbeat thread keeps renewing
+    while the run is alive, so a worker that dies only blocks the next run until
+    the lease runs out rather than for the whole task time limit.
+
+    Attributes:
+        name (str): Lock name, usually the task name
+        lease (float): Seconds the lock survives without a heartbeat
+        wait_seconds (float): Time spent waiting to acquire the lock
+        lost (bool): True if the lease expired before the run finished
+    """
+
+    def __init__(self, name, lease=None, client=None):
+        self.name = name
+        self.lease = lease or getattr(settings, 'SINGLE_FLIGHT_LEASE_SECONDS', 60)
+        self.client = client
+        self.wait_seconds = 0.0
+        self.lost = False
+        self._lock = None
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    @property
+    def key(self):
+        return f"single-flight:{self.name}"
+
+    def acquire(self, wait=0):
+        """Try to take the lock, waiting up to wait seconds. Returns True if it was taken."""
+        self._lock = self.client.lock(self.key, timeout=self.lease, thread_local=False)
+        start_time = time.perf_counter()
+        acquired = self._lock.acquire(blocking=wait > 0, blocking_timeout=wait or None)
+        self.wait_seconds = round(time.perf_counter() - start_time, 3)
+
+        if acquired:
+            self._heartbeat = threading.Thread(target=self._renew, daemon=True)
+            self._heartbeat.start()
+        return acquired
+
+    def release(self):
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.join()
+        try:
+            self._lock.release()
+        except Exception as e:
+            # Already expired and possibly taken by another run, nothing left to release
+            logger.warning(f"Could not release lock {self.name}: {e}")
+
+    def _renew(self):
+        while not self._stop.wait(self.lease / 3):
+            try:
+                self._lock.reacquire()
+            except Exception as e:
+                self.lost = True
+                logger.warning(f"Lost lock {self.name}, another run may start: {e}")
+                return
+
+    def note_skip(self, merge=False):
+        """Record a duplicate run that was skipped, and whether it asked for a rerun."""
+        pipe = self.client.pipeline()
+        pipe.incr(f"{self.key}:skips")
+        if merge:
+            pipe.set(f"{self.key}:rerun", 1)
+        pipe.execute()
+
+    def collect_skips(self):
+        """
+        Return and reset the duplicates recorded while this run held the lock.
+
+        Returns:
+            tuple: (number of skipped runs, whether any of them asked for a rerun)
+        """
+        pipe = self.client.pipeline()
+        pipe.get(f"{self.key}:skips")
+        pipe.get(f"{self.key}:rerun")
+        pipe.delete(f"{self.key}:skips", f"{self.key}:rerun")
+        skips, rerun, _ = pipe.execute()
+        return int(skips or 0), bool(rerun)
+
+def single_flight(name, wait=0, merge=False, lease=None):
+    """
+    Decorator for Celery tasks that must not run twice at the same time.
+
+    A run that finds the lock held waits up to wait seconds, then is skipped. With
+    merge, a skipped run asks the running one to dispatch the task once more when
+    it finishes, so work that arrived during the run isn't left for the next
+    schedule; merge needs a bound task (bind=True).
+
+    The task result, if a dict, gets a "lock" entry with the wait time and the
+    number of duplicate runs skipped while this one held the lock.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            client = get_redis()
+            if client is None:
+                return func(*args, **kwargs)
+
+            lock = SingleFlightLock(name, lease=lease, client=client)
+            try:
+                acquired = lock.acquire(wait=wait)
+            except Exception as e:
+                logger.warning(f"Lock {name} unavailable, running without it: {e}")
+                return func(*args, **kwargs)
+
+            if not acquired:
+                merged = merge
+                try:
+                    lock.note_skip(merge=merge)
+                except Exception as e:
+                    # The skip is only bookkeeping, the running task still finishes its work
+                    logger.warning(f"Could not record the skipped run of {name}: {e}")
+                    merged = False
+                logger.info(f"{name} is already running, {'merged into it' if merged else 'skipped'}")
+                return {
+                    "message": f"{name} is already running.",
+                    "lock": {"acquired": False, "merged": merged, "wait_seconds": lock.wait_seconds},
+                }
+
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                lock.release()
+                try:
+                    skips, rerun = lock.collect_skips()
+                except Exception as e:
+                    # Never hide the task's own exception behind a Redis error
+                    logger.warning(f"Could not read skipped runs of {name}: {e}")
+                    skips, rerun = 0, False
+
+            if rerun:
+                # A duplicate asked to be merged, run once more to pick up what it was for
+                args[0].apply_async(args=args[1:], kwargs=kwargs)
+
+            stats = {
+                "acquired": True,
+                "wait_seconds": lock.wait_seconds,
+                "skipped": skips,
+                "rerun": rerun,
+                "lost": lock.lost,
+            }
+            if isinstance(result, dict):
+                result["lock"] = stats
+            return result
+        return wrapper
+    return decorator
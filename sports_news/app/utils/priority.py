@@ -0,0 +1,50 @@
+from app.utils.prompts import get_category, get_category_scores
+from django.utils import timezone
+
+# How many hours of freshness each category is worth, e.g. a contract story
+# scraped now goes ahead of game previews scraped in the next three hours
+CATEGORY_WEIGHTS = {
+    "contract": 3.0,
+    "playoff": 2.5,
+    "injury": 2.0,
+    "milestone": 2.0,
+    "game_recap": 1.0,
+    "event": 1.0,
+    "game_preview": 0.0,
+}
+
+# News that should jump the queue whatever its category
+BREAKING_KEYWORDS = ["trade", "traded", "acquire", "fired", "suspended", "retire", "breaking"]
+BREAKING_WEIGHT = 3.0
+
+# Highlights go stale faster than articles
+SOURCE_WEIGHTS = {"article": 0.0, "video": 0.5}
+
+def get_importance(title: str, desc: str, source: str = "article") -> float:
+    """
+    How important a story is, in hours of freshness.
+
+    Uses the same category scores as the prompt, plus up to an hour for stories
+    matching their category strongly, breaking-news keywords and the source.
+    """
+    category_scores = get_category_scores(title, desc)
+    category = get_category(title, desc, highlight=source == "video", category_scores=category_scores)
+
+    importance = CATEGORY_WEIGHTS.get(category, 0.0)
+    importance += min(max(category_scores.get(category, 0) - 1, 0), 4) * 0.25
+
+    content = (title + " " + desc).lower()
+    if any(keyword in content for keyword in BREAKING_KEYWORDS):
+        importance += BREAKING_WEIGHT
+    return importance + SOURCE_WEIGHTS.get(source, 0.0)
+
+def get_priority(title: str, desc: str, source: str = "article", published_at=None) -> float:
+    """
+    Priority of a pending item, higher goes first.
+
+    The score is the publish time in hours plus the importance, so a descending
+    index on it orders by recency and importance at once, and the score never
+    needs recomputing as items age.
+    """
+    published_at = published_at or timezone.now()
+    return round(published_at.timestamp() / 3600 + get_importance(title, desc, source), 4)
@@ -1,4 +1,5 @@
-from langchain.prompts import PromptTemplate
+from functools import lru_cache
+import random
 import re
 
 # Define content categories with appropriate emoji sets
@@ -137,7 +138,96 @@ team_contexts = {
     "utah_hockey_club": "Newly relocated team to Salt Lake City; building a fresh fanbase and team identity."
 }
 
-def get_prompt(title: str, desc: str, highlight: bool = False):
+# Rules shared by both templates
+_SHARED_RULES = """- MUST be 150-250 characters long
+- CRITICAL: Be COMPLETELY accurate with scores, player names, team names, and statistics
+- Include the {emoji} emoji and end with the hashtags: {hashtags}
+- DO NOT substitute, invent, or make up players, teams, or facts not in the title or description
+- DO NOT include puzzles, questions, instructions, placeholders, or unrelated content
+- ONLY output the final post text with no prefix, explanation, or quotation marks
+
+NAME HANDLING:
+- Use player names EXACTLY as they appear in the title/description
+- If only a last name is given (e.g., "McDavid scores"), use ONLY that last name
+- NEVER guess or add first names, and NEVER refer to players by first name only
+
+Your social media post:"""
+
+HIGHLIGHT_TEMPLATE = """You are a factual hockey reporter who writes concise, neutral social media posts about NHL game results.
+
+Title: {title}
+Description: {description}
+Category: {category}
+EXTRACTED SCORE: {score}
+Context: {context}
+
+TASK: Write ONE factual game highlight post reporting the key information.
+- MUST use the EXTRACTED SCORE exactly; never modify or recalculate it
+- Report goals, shots, power play conversions or other relevant statistics
+- Use objective language without team bias or emotional words (e.g., "amazing," "disappointing")
+""" + _SHARED_RULES
+
+ARTICLE_TEMPLATE = """You are a knowledgeable hockey commentator who writes brief, engaging social media posts about NHL news.
+
+Title: {title}
+Description: {description}
+Category: {category}
+Tone: {tone}
+Context: {context}
+
+TASK: Write ONE short news post that sounds like a knowledgeable fan's comment, not a bland summary.
+- Focus on one key point or implication; you can be witty or mildly excited
+- DO NOT use injury-related emojis for non-injury news
+""" + _SHARED_RULES
+
+def get_category_scores(title: str, desc: str) -> dict:
+    """Score how well a title and description match each content category."""
+    content = (title + " " + desc).lower()
+
+    # Determine content category with weighted scoring
+    category_scores = {}
+    for category, data in categories.items():
+        # Start with a base score of 0
+        score = 0
+        
+        # Add points for each keyword match
+        for keyword in data["keywords"]:
+            if keyword in content:
+                score += 1
+        
+        # Subtract points for negative context (only for injury category)
+        if category == "injury" and "negative_context" in data:
+            for neg_context in data["negative_context"]:
+                if neg_context in content:
+                    score -= 2
+        
+        # Store the score
+        category_scores[category] = score
+    return category_scores
+
+def get_category(title: str, desc: str, highlight: bool = False, category_scores: dict = None) -> str:
+    """Pick the content category for a title and description."""
+    if category_scores is None:
+        category_scores = get_category_scores(title, desc)
+
+    # Select the category with the highest score
+    selected_category = max(category_scores, key=category_scores.get)
+    
+    # If the highest score is 0 or negative, default to game_preview
+    if category_scores[selected_category] <= 0:
+        selected_category = "game_preview"
+    
+    # Special case for global series
+    if "global series" in (title + " " + desc).lower():
+        selected_category = "event"
+    
+    # Force game_recap category if highlight parameter is True
+    if highlight:
+        selected_category = "game_recap"
+    return selected_category
+
+def get_prompt_variables(title: str, desc: str, highlight: bool = False) -> dict:
+    """Analyze a title and description and return the values for the prompt template."""
     # Analyze content to determine article type
     content = (title + " " + desc).lower()
     
@@ -190,43 +280,9 @@ def get_prompt(title: str, desc: str, highlight: bool = False):
                 # If we can't reliably determine teams, just mention the score directly
                 score_display = f"Final Score: {exact_score}"
 
-    # Determine content category with weighted scoring
-    category_scores = {}
-    for category, data in categories.items():
-        # Start with a base score of 0
-        score = 0
-        
-        # Add points for each keyword match
-        for keyword in data["keywords"]:
-            if keyword in content:
-                score += 1
-        
-        # Subtract points for negative context (only for injury category)
-        if category == "injury" and "negative_context" in data:
-            for neg_context in data["negative_context"]:
-                if neg_context in content:
-                    score -= 2
-        
-        # Store the score
-        category_scores[category] = score
-    
-    # Select the category with the highest score
-    selected_category = max(category_scores, key=category_scores.get)
-    
-    # If the highest score is 0 or negative, default to game_preview
-    if category_scores[selected_category] <= 0:
-        selected_category = "game_preview"
-    
-    # Special case for global series
-    if "global series" in content:
-        selected_category = "event"
-    
-    # Force game_recap category if highlight parameter is True
-    if highlight:
-        selected_category = "game_recap"
+    selected_category = get_category(title, desc, highlight)
     
     # Select emoji and hashtags
-    import random
     emoji = random.choice(categories[selected_category]["emojis"])
     hashtags = [categories[selected_category]["hashtags"][0]]
     
@@ -274,95 +330,30 @@ def get_prompt(title: str, desc: str, highlight: bool = False):
     # Get the appropriate tone
     tone = categories[selected_category]["tone"]
     
-    # Choose the appropriate prompt template based on the highlight parameter
-    if highlight:
-        prompt = PromptTemplate.from_template(f"""
-            You are a factual hockey reporter who creates concise, neutral social media posts about NHL game results.
-            You have an informative, objective tone and accurate hockey knowledge.
-
-            Title of article: {title}
-            Description of game including the score: {desc}
-            Content category: {selected_category}
-            Required emoji: {emoji}
-            Required hashtags: {hashtag_str}
-            
-            EXTRACTED SCORE: {score_display}
-            
-            Hockey context (use this to inform your commentary):
-            {context_str}
-
-            TASK:
-            Write ONE factual hockey game highlight for social media that reports the key information.
-            - MUST be EXACTLY 150-250 characters long
-            - MUST use the EXACT FINAL SCORE as provided in "EXTRACTED SCORE" field: {score_display}
-            - DO NOT modify or recalculate the score under any circumstances
-            - Use clear, neutral language that emphasizes facts over emotion
-            - Report goals, shots, power play conversions or other relevant statistics
-            - Maintain an objective tone without team bias
-            - CRITICAL: Be COMPLETELY accurate with scores, player names, and team names
-            - ONLY use player names explicitly mentioned in the title or description
-            - Include the {emoji} emoji somewhere in your post
-            - End your post with the hashtags: {hashtag_str}
-            - Prioritize accuracy and precision over entertainment value
-            - DO NOT use subjective or emotional language (e.g., "amazing," "disappointing")
-            - DO NOT try to guess a player's first name if it is not included
-            - DO NOT substitute or invent players, teams, or facts
-            - DO NOT include puzzles, questions, or unrelated content
-            - DO NOT include any instructions or placeholders
-            - DO NOT make up information not present in the title or description
-            - ONLY output the final social media post text with no prefix or explanation
-
-            CRITICAL NAME HANDLING:
-            - ONLY use player names EXACTLY as they appear in the title/description
-            - If only a last name is given (e.g., "McDavid scores"), use ONLY that last name
-            - NEVER guess, complete, or add first names to last names
-            - NEVER refer to players by first name only
-
-            Your social media post:
-            """
-        )
-    else:
-        prompt = PromptTemplate.from_template(f"""
-            You are a knowledgeable hockey commentator who creates brief, engaging social media posts about NHL news.
-            You have a authentic, conversational tone and deep hockey knowledge.
-
-            Title of article: {title}
-            Description: {desc}
-            Content category: {selected_category}
-            Required emoji: {emoji}
-            Required hashtags: {hashtag_str}
-            Tone guidance: {tone}
-            
-            Hockey context (use this to inform your commentary):
-            {context_str}
-
-            TASK:
-            Write ONE short hockey news post for social media that sounds like a knowledgeable fan's comment, not a bland summary.
-            - MUST be EXACTLY 150-250 characters long
-            - Focus on providing a brief, conversational comment about the news
-            - You can be witty, express mild excitement, or make observations a knowledgeable fan would make
-            - Use clear, straightforward language with an authentic hockey fan's voice
-            - CRITICAL: Be COMPLETELY accurate with player names, team names, and statistics
-            - ONLY use player names explicitly mentioned in the title or description
-            - Include the {emoji} emoji somewhere in your post
-            - End your post with the hashtags: {hashtag_str}
-            - DO NOT recite every detail from the article - focus on one key point or implication
-            - DO NOT try to guess a player's first name if it is not included
-            - DO NOT substitute or invent players, teams, or facts
-            - DO NOT include puzzles, questions, or unrelated content
-            - DO NOT include any instructions or placeholders
-            - DO NOT make up information not present in the title or description
-            - DO NOT use injury-related emojis for non-injury news
-            - ONLY output the final social media post text with no prefix or explanation
-
-            CRITICAL NAME HANDLING:
-            - ONLY use player names EXACTLY as they appear in the title/description
-            - If only a last name is given (e.g., "McDavid scores"), use ONLY that last name
-            - NEVER guess, complete, or add first names to last names
-            - NEVER refer to players by first name only
+    return {
+        "title": title,
+        "description": desc,
+        "category": selected_category,
+        "emoji": emoji,
+        "hashtags": hashtag_str,
+        "score": score_display,
+        "tone": tone,
+        "context": context_str,
+    }
 
-            Your social media post:
-            """
-        )
+@lru_cache(maxsize=None)
+def get_prompt(highlight: bool = False):
+    """
+    Return the compiled prompt template for highlights or articles.
     
-    return prompt
\ No newline at end of file
+    Templates are parsed once per process and reused, so rendering a prompt
+    only fills in the variables returned by get_prompt_variables. LangChain is
+    imported on first use to keep it out of process startup.
+    """
+    from langchain_core.prompts import PromptTemplate
+    
+    return PromptTemplate.from_template(HIGHLIGHT_TEMPLATE if highlight else ARTICLE_TEMPLATE)
+
+def render_prompt(title: str, desc: str, highlight: bool = False) -> str:
+    """Build the variables for a post and render them into the final prompt text."""
+    return get_prompt(highlight).format(**get_prompt_variables(title, desc, highlight))
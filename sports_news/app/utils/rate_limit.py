@@ -0,0 +1,70 @@
+import threading
+import time
+
+class RateLimit:
+    """
+    Tracks the RateLimit-* response headers the PDS sends with every XRPC call.
+
+    Limits are kept per endpoint, since createRecord and uploadBlob are limited
+    separately from the global per-account limit. A request has to wait while any
+    endpoint is down to its reserve, until that endpoint's window resets.
+
+    Attributes:
+        reserve (int): Requests to leave unused in each window
+        min_interval (float): Minimum seconds between two sends
+    """
+
+    def __init__(self, reserve=5, min_interval=1.0):
+        self.reserve = reserve
+        self.min_interval = min_interval
+        self.endpoints = {}
+        self.last_sent = None
+        self._lock = threading.Lock()
+
+    def update(self, endpoint, headers, status_code=None):
+        """Record the limit state from one response (or error response)."""
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        state = {
+            "limit": _int(headers.get('ratelimit-limit')),
+            "remaining": _int(headers.get('ratelimit-remaining')),
+            "reset": _int(headers.get('ratelimit-reset')),
+        }
+
+        if status_code == 429:
+            state["remaining"] = 0
+            retry_after = _int(headers.get('retry-after'))
+            if retry_after is not None:
+                state["reset"] = max(state["reset"] or 0, int(time.time()) + retry_after)
+
+        if state["remaining"] is None and state["reset"] is None:
+            return
+        with self._lock:
+            self.endpoints[endpoint] = state
+
+    def mark_sent(self):
+        self.last_sent = time.time()
+
+    def wait_time(self):
+        """Seconds to wait before the next send to stay within every known limit."""
+        now = time.time()
+        wait = 0.0
+        if self.last_sent is not None:
+            wait = max(wait, self.last_sent + self.min_interval - now)
+
+        with self._lock:
+            for state in self.endpoints.values():
+                if state["remaining"] is None or state["reset"] is None:
+                    continue
+                if state["remaining"] <= self.reserve and state["reset"] > now:
+                    wait = max(wait, state["reset"] - now)
+        return wait
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(state) for endpoint, state in self.endpoints.items()}
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
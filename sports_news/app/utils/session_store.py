@@ -0,0 +1,59 @@
+from django.conf import settings
+import hashlib
+import logging
+import base64
+import os
+
+logger = logging.getLogger(__name__)
+
+def _fernet():
+    """
+    Return the cipher used for stored sessions.
+    
+    Uses SESSION_ENCRYPTION_KEY (a Fernet key) if set, otherwise a key derived
+    from the Django SECRET_KEY.
+    """
+    from cryptography.fernet import Fernet
+
+    key = os.getenv('SESSION_ENCRYPTION_KEY')
+    if not key:
+        key = base64.urlsafe_b64encode(hashlib.sha256(settings.SECRET_KEY.encode()).digest())
+    return Fernet(key)
+
+def load_session(pds_url: str, handle: str):
+    """
+    Return the decrypted session string saved for this account, or None.
+    """
+    from app.models import BlueskySession
+    from cryptography.fernet import InvalidToken
+
+    try:
+        stored = BlueskySession.objects.filter(pds_url=pds_url or "", handle=handle or "").first()
+        if not stored:
+            return None
+        return _fernet().decrypt(stored.session.encode()).decode()
+    except InvalidToken:
+        logger.warning(f"Stored Bluesky session for {handle} could not be decrypted, ignoring it")
+        return None
+    except Exception as e:
+        logger.warning(f"Could not load stored Bluesky session: {e}")
+        return None
+
+def save_session(pds_url: str, handle: str, session_string: str):
+    """Encrypt and save the session string for this account."""
+    from app.models import BlueskySession
+
+    try:
+        BlueskySession.objects.update_or_create(
+            pds_url=pds_url or "",
+            handle=handle or "",
+            defaults={"session": _fernet().encrypt(session_string.encode()).decode()},
+        )
+    except Exception as e:
+        logger.warning(f"Could not save Bluesky session: {e}")
+
+def clear_session(pds_url: str, handle: str):
+    """Forget the stored session, e.g. after it was rejected by the PDS."""
+    from app.models import BlueskySession
+
+    BlueskySession.objects.filter(pds_url=pds_url or "", handle=handle or "").delete()
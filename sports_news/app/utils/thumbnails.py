@@ -0,0 +1,257 @@
+from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+import requests
+import hashlib
+import logging
+import time
+import io
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+def _revalidate_after():
+    """How long a cached URL is trusted before it is revalidated with a conditional GET."""
+    return timedelta(seconds=getattr(settings, 'THUMBNAIL_REVALIDATE_AFTER', 24 * 3600))
+
+def _blob_ref(data):
+    from atproto_client.models.blob_ref import BlobRef
+
+    return BlobRef.model_validate(data)
+
+def get_thumbnail_blob(client, url: str):
+    """
+    Return a blob ref for the image at url, uploading it only if needed.
+
+    A recently checked URL that was already uploaded is reused without any
+    request, and one that was prepared by the scrape-time prefetch is uploaded
+    without downloading it again. Anything else goes through fetch_thumbnail.
+
+    Args:
+        client: A logged in atproto Client used for upload_blob
+        url (str): The image URL
+
+    Returns:
+        tuple: (BlobRef or None, info dict with the cache outcome)
+    """
+    from app.models import ThumbnailSource
+
+    source = ThumbnailSource.objects.select_related("thumbnail").filter(url=url).first()
+
+    # Once uploaded, the image itself isn't kept, so a thumbnail whose blob was
+    # dropped has to be downloaded again
+    if source and (source.thumbnail.blob_ref or source.thumbnail.data) and timezone.now() - source.checked_at < _revalidate_after():
+        thumbnail = source.thumbnail
+        info = {"url": url, "cache": "url" if thumbnail.blob_ref else "prepared"}
+    else:
+        thumbnail, info = fetch_thumbnail(url, source)
+        if thumbnail is None:
+            return None, info
+
+    if not thumbnail.blob_ref:
+        if not thumbnail.data:
+            info["cache"] = "error"
+            return None, info
+        upload_thumbnail(client, thumbnail, info)
+
+    return _blob_ref(thumbnail.blob_ref), info
+
+def fetch_thumbnail(url: str, source=None):
+    """
+    Download, validate and prepare the image at url without uploading it.
+
+    A known URL is revalidated with If-None-Match/If-Modified-Since so a 304
+    skips the download. A downloaded image is looked up by the hash of its
+    bytes, so identical images from different URLs share one Thumbnail and one
+    upload; new images are transcoded and stored ready for upload.
+
+    Args:
+        url (str): The image URL
+        source: The ThumbnailSource for url if the caller already loaded it
+
+    Returns:
+        tuple: (Thumbnail or None if the URL isn't a usable image, info dict);
+               info["transient"] is set when the failure is worth retrying later,
+               e.g. a timeout or a server error, rather than a missing or unusable image
+    """
+    from app.models import Thumbnail, ThumbnailSource
+
+    info = {"url": url, "cache": "miss"}
+    if source is None:
+        source = ThumbnailSource.objects.select_related("thumbnail").filter(url=url).first()
+    cached = source.thumbnail if source and (source.thumbnail.blob_ref or source.thumbnail.data) else None
+
+    headers = dict(HEADERS)
+    if cached:
+        if source.etag:
+            headers['If-None-Match'] = source.etag
+        if source.last_modified:
+            headers['If-Modified-Since'] = source.last_modified
+
+    start_time = time.perf_counter()
+    try:
+        response, content = _download(url, headers)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.warning(f"Error downloading image {url}: {e}")
+        # An oversized image stays oversized, a network error may not happen again
+        info.update(cache="error", error=str(e), transient=isinstance(e, requests.exceptions.RequestException))
+        return None, info
+    info["download_seconds"] = round(time.perf_counter() - start_time, 3)
+
+    if cached and response.status_code == 304:
+        source.checked_at = timezone.now()
+        source.save(update_fields=["checked_at"])
+        info["cache"] = "url" if cached.blob_ref else "prepared"
+        return cached, info
+
+    content_type = response.headers.get('Content-Type', '')
+    if response.status_code != 200 or not content_type.startswith('image/'):
+        logger.warning(f"Not an image at {url}: HTTP {response.status_code} {content_type}")
+        info.update(
+            cache="error",
+            error=f"HTTP {response.status_code} {content_type}",
+            transient=response.status_code in (408, 429) or response.status_code >= 500,
+        )
+        return None, info
+
+    # Key on the source bytes so identical images dedupe before any transcoding work
+    content_hash = hashlib.sha256(content).hexdigest()
+    thumbnail = Thumbnail.objects.filter(content_hash=content_hash).first()
+
+    if thumbnail and (thumbnail.blob_ref or thumbnail.data):
+        info["cache"] = "content"
+    else:
+        data, mime_type = prepare_thumbnail(content, content_type.split(';')[0])
+        if data is None:
+            info.update(cache="error", error="image too large")
+            return None, info
+
+        info["source_bytes"] = len(content)
+        info["upload_bytes"] = len(data)
+        info["bytes_saved"] = len(content) - len(data)
+        thumbnail, _ = Thumbnail.objects.update_or_create(
+            content_hash=content_hash,
+            defaults={
+                "mime_type": mime_type,
+                "size": len(data),
+                "source_size": len(content),
+                "data": data,
+            },
+        )
+
+    ThumbnailSource.objects.update_or_create(
+        url=url,
+        defaults={
+            "thumbnail": thumbnail,
+            "etag": response.headers.get('ETag', '')[:255],
+            "last_modified": response.headers.get('Last-Modified', '')[:64],
+            "checked_at": timezone.now(),
+        },
+    )
+    return thumbnail, info
+
+def upload_thumbnail(client, thumbnail, info=None):
+    """
+    Upload a prepared Thumbnail and store the blob ref it was given.
+
+    The prepared image is dropped once the PDS has it, only the blob ref is
+    needed to post it.
+    """
+    start_time = time.perf_counter()
+    blob = client.upload_blob(bytes(thumbnail.data)).blob
+    if info is not None:
+        info["upload_seconds"] = round(time.perf_counter() - start_time, 3)
+
+    thumbnail.blob_ref = blob.model_dump(by_alias=True)
+    thumbnail.uploaded_at = timezone.now()
+    thumbnail.data = None
+    thumbnail.save(update_fields=["blob_ref", "uploaded_at", "data"])
+    return blob
+
+def _download(url: str, headers: dict):
+    """
+    Stream an image download, refusing anything over THUMBNAIL_MAX_SOURCE_BYTES.
+
+    Returns:
+        tuple: (response, content bytes); content is empty unless the status is 200
+
+    Raises:
+        ValueError: If the image is larger than the allowed source size
+    """
+    max_bytes = getattr(settings, 'THUMBNAIL_MAX_SOURCE_BYTES', 15 * 1024 * 1024)
+
+    with requests.get(url, headers=headers, timeout=10, stream=True) as response:
+        if response.status_code != 200:
+            return response, b""
+
+        if int(response.headers.get('Content-Length') or 0) > max_bytes:
+            raise ValueError(f"image is {response.headers['Content-Length']} bytes, limit is {max_bytes}")
+
+        content = bytearray()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            content.extend(chunk)
+            if len(content) > max_bytes:
+                raise ValueError(f"image is over the {max_bytes} byte limit")
+        return response, bytes(content)
+
+def prepare_thumbnail(content: bytes, mime_type: str):
+    """
+    Downsize and recompress an image to fit a link card thumbnail.
+
+    Images are scaled to fit within THUMBNAIL_MAX_SIZE and re-encoded as JPEG at
+    decreasing quality until they fit THUMBNAIL_MAX_BYTES. The original is kept
+    if it is already smaller. Without Pillow the original is used as long as it
+    fits the PDS blob limit.
+
+    Returns:
+        tuple: (bytes, mime type), or (None, None) if the image can't be used
+    """
+    max_bytes = getattr(settings, 'THUMBNAIL_MAX_BYTES', 300 * 1000)
+    blob_limit = getattr(settings, 'THUMBNAIL_BLOB_LIMIT', 1000 * 1000)
+
+    try:
+        data, new_mime_type = _transcode(content, max_bytes)
+    except ImportError:
+        logger.warning("Pillow is not installed, uploading thumbnails as downloaded")
+        data, new_mime_type = content, mime_type
+    except Exception as e:
+        logger.warning(f"Could not transcode thumbnail: {e}")
+        data, new_mime_type = content, mime_type
+
+    if len(content) <= len(data):
+        data, new_mime_type = content, mime_type
+
+    if len(data) > blob_limit:
+        logger.warning(f"Thumbnail is {len(data)} bytes, over the {blob_limit} byte blob limit")
+        return None, None
+    return data, new_mime_type
+
+def _transcode(content: bytes, max_bytes: int):
+    from PIL import Image, ImageOps
+
+    max_size = getattr(settings, 'THUMBNAIL_MAX_SIZE', (1200, 1200))
+
+    with Image.open(io.BytesIO(content)) as image:
+        # Let the JPEG decoder scale down while decoding, much cheaper than a full decode
+        image.draft("RGB", max_size)
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(max_size)
+
+        if image.mode != "RGB":
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+
+        for quality in (85, 75, 65, 50):
+            output = io.BytesIO()
+            image.save(output, "JPEG", quality=quality, optimize=True, progressive=True)
+            if output.tell() <= max_bytes:
+                break
+        return output.getvalue(), "image/jpeg"
+
+def invalidate_thumbnail(url: str):
+    """Drop the cached blob for url, e.g. after the PDS no longer has it."""
+    from app.models import Thumbnail
+
+    Thumbnail.objects.filter(sources__url=url).update(blob_ref=None, uploaded_at=None)
@@ -1,4 +1,12 @@
 from django.contrib import admin
 from highlights.models import Video
 
-admin.site.register(Video)
\ No newline at end of file
+@admin.register(Video)
+class VideoAdmin(admin.ModelAdmin):
+    list_display = ("title", "status", "thumb_status", "attempts", "timestamp", "posted_at")
+    list_filter = ("status",)
+    search_fields = ("title",)
+    # Served by video_timestamp_idx, and video_failed_idx when filtering on failed
+    ordering = ("-timestamp",)
+    # Skip the unfiltered COUNT(*) over the whole history on every page
+    show_full_result_count = False
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('highlights', '0002_alter_video_description'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='generated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='generated_model',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='generated_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='generation_latency',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('highlights', '0003_video_generated_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='thumb_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='thumb_error',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='thumb_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('uploaded', 'Uploaded'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+def backfill_status(apps, schema_editor):
+    """Derive the status of existing rows from is_new and generated_text."""
+    Video = apps.get_model("highlights", "Video")
+    # Rows the uploader already took were posted or lost, there is no way to tell
+    Video.objects.filter(is_new=False).update(status="posted")
+    Video.objects.filter(is_new=True).exclude(generated_text="").update(status="generated")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('highlights', '0005_video_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='last_error',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='post_uri',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='posted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='status',
+            field=models.CharField(choices=[('scraped', 'Scraped'), ('generated', 'Generated'), ('queued', 'Queued'), ('posted', 'Posted'), ('failed', 'Failed')], default='scraped', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('status__in', ['scraped', 'generated'])), fields=['status', 'id'], name='video_pending_idx'),
+        ),
+        migrations.RunPython(backfill_status, migrations.RunPython.noop),
+    ]
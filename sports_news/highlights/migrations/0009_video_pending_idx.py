@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('highlights', '0008_video_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='video',
+            name='video_pending_idx',
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(condition=models.Q(('status__in', ['scraped', 'generated'])), fields=['-priority', 'id'], name='video_pending_idx'),
+        ),
+    ]
@@ -8,6 +8,60 @@ class Video(models.Model):
     embed_url = models.URLField(unique=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     is_new = models.BooleanField(default=True)
+    generated_text = models.TextField(blank=True, default="")
+    generated_model = models.CharField(max_length=50, blank=True, default="")
+    generation_latency = models.FloatField(null=True, blank=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+    thumb_status = models.CharField(max_length=10, default="pending", choices=[
+        ("pending", "Pending"),
+        ("ready", "Ready"),
+        ("uploaded", "Uploaded"),
+        ("failed", "Failed"),
+    ])
+    thumb_error = models.CharField(max_length=255, blank=True, default="")
+    thumb_checked_at = models.DateTimeField(null=True, blank=True)
+    lease_token = models.UUIDField(null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=10, default="scraped", choices=[
+        ("scraped", "Scraped"),
+        ("generated", "Generated"),
+        ("queued", "Queued"),
+        ("posted", "Posted"),
+        ("failed", "Failed"),
+    ])
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.CharField(max_length=500, blank=True, default="")
+    post_uri = models.CharField(max_length=255, blank=True, default="")
+    posted_at = models.DateTimeField(null=True, blank=True)
+    # Publish time in hours plus importance, see app.utils.priority
+    priority = models.FloatField(default=0)
+
+    # Statuses the uploader still has to pick up
+    PENDING_STATUSES = ("scraped", "generated")
+
+    class Meta:
+        indexes = [
+            # Only pending rows are indexed, in claim order, so the uploader's scan doesn't grow with the posted history
+            models.Index(
+                fields=["-priority", "id"],
+                condition=models.Q(status__in=["scraped", "generated"]),
+                name="video_pending_idx",
+            ),
+            # Rows a batch has leased, only set while an upload holds them
+            models.Index(
+                fields=["lease_token"],
+                condition=models.Q(lease_token__isnull=False),
+                name="video_lease_idx",
+            ),
+            # requeue_failed and the admin's failed filter
+            models.Index(
+                fields=["-timestamp"],
+                condition=models.Q(status="failed"),
+                name="video_failed_idx",
+            ),
+            # The admin's newest-first changelist
+            models.Index(fields=["-timestamp"], name="video_timestamp_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -1,20 +1,31 @@
 # highlights/tasks.py
 from celery import shared_task
 from highlights.video_scraper import VideoScraperService
+from app.tasks import pregenerate_posts, prefetch_thumbnails
+from app.utils.locks import single_flight
 import logging
 
 logger = logging.getLogger(__name__)
 
 @shared_task
+@single_flight("scrape_youtube_videos")
 def scrape_youtube_videos(channel_id=None, max_results=10, video_duration="medium"):
     """Celery task to scrape YouTube videos and add them to the database"""
     task_logger = TaskLogger()
     scraper_service = VideoScraperService(logger=task_logger)
-    return scraper_service.scrape_videos(
+    results = scraper_service.scrape_videos(
         channel_id=channel_id,
         max_results=max_results,
         video_duration=video_duration
     )
+    
+    # Generate post text and prepare thumbnails for the new rows while the worker would otherwise be idle
+    if results.get("video_ids"):
+        prefetch_thumbnails.delay(article_ids=[], video_ids=results["video_ids"])
+        # The upload is triggered when pre-generation finishes, so it only posts
+        pregenerate_posts.delay(article_ids=[], video_ids=results["video_ids"], then_upload=True)
+    
+    return results
 
 class TaskLogger:
     """Logger adapter for Celery tasks that logs to the Celery logger"""
@@ -1,4 +1,7 @@
 from highlights.models import Video
+from app.utils.priority import get_priority
+from app.archive import is_archived
+from django.utils.dateparse import parse_datetime
 import requests
 import time
 import re
@@ -81,6 +84,7 @@ class YouTubeScraper:
             data = self.send_api_req(url)
 
             titles = []
+            ids = []
             count = 0
             
             if "items" in data and data["items"]:
@@ -89,29 +93,38 @@ class YouTubeScraper:
                     if title.startswith("NHL Highlights"):
                         video_id = item["id"]["videoId"]
                         if video_id:
-                            if not Video.objects.filter(vid_id=video_id).exists():
+                            if not Video.objects.filter(vid_id=video_id).exists() and not is_archived("video", video_id):
                                 # Fetch the full description
                                 full_description = self.get_full_video_description(video_id)
                                 
-                                Video.objects.create(
+                                created = Video.objects.create(
                                     vid_id = video_id,
                                     title = title,
                                     description = full_description,  # Use full description
                                     img_url = item["snippet"]["thumbnails"]["high"]["url"],
                                     embed_url = f"https://www.youtube.com/watch?v={video_id}",
-                                    is_new = True
+                                    is_new = True,
+                                    priority = get_priority(
+                                        title,
+                                        full_description,
+                                        source="video",
+                                        published_at=parse_datetime(item["snippet"].get("publishedAt") or "")
+                                    )
                                 )
                                 titles.append(f"Uploaded: {video_id}")
+                                ids.append(created.id)
                                 count += 1
 
                 return {
                     'count': count,
-                    'titles': titles
+                    'titles': titles,
+                    'ids': ids
                 }
             else:
                 return {
                     'count': 0,
-                    'titles': []
+                    'titles': [],
+                    'ids': []
                 }
                 
         except (requests.exceptions.RequestException, KeyError, IndexError) as e:
@@ -119,5 +132,6 @@ class YouTubeScraper:
             return {
                 'count': 0,
                 'titles': [],
+                'ids': [],
                 'error': str(e)
             }
\ No newline at end of file
@@ -95,6 +95,7 @@ class VideoScraperService:
                 return {
                     "videos_scraped": results["count"],
                     "titles": results["titles"],
+                    "video_ids": results.get("ids", []),
                     "error": results.get("error")
                 }
                     
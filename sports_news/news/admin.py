@@ -1,4 +1,12 @@
 from django.contrib import admin
 from news.models import Article
 
-admin.site.register(Article)
+@admin.register(Article)
+class ArticleAdmin(admin.ModelAdmin):
+    list_display = ("title", "status", "thumb_status", "attempts", "timestamp", "posted_at")
+    list_filter = ("status",)
+    search_fields = ("title",)
+    # Served by article_timestamp_idx, and article_failed_idx when filtering on failed
+    ordering = ("-timestamp",)
+    # Skip the unfiltered COUNT(*) over the whole history on every page
+    show_full_result_count = False
@@ -0,0 +1,107 @@
+# sports_news/news/management/commands/benchmark_scrapers.py
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+from news.models import Snapshot
+from news.utils.snapshots import decompress, latest_fetches
+from pathlib import Path
+import statistics
+import json
+import time
+
+DEFAULT_SCRAPERS = [
+    'news.utils.nhl_scraper.NHLScraper',
+    'news.utils.nhl_structured_scraper.NHLStructuredScraper',
+]
+
+FIELDS = ("title", "description", "img_url")
+
+class Command(BaseCommand):
+    help = "Compares the article parsing throughput of scrapers on recorded pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scraper', action='append',
+                            help='Dotted path of a ScraperBase subclass (repeatable, default: the HTML and structured NHL scrapers)')
+        parser.add_argument('--fixtures', help='Directory of recorded .html pages, instead of the stored snapshots')
+        parser.add_argument('--limit', type=int, default=500, help='Snapshots to use')
+        parser.add_argument('--rounds', type=int, default=3, help='Passes over the pages per scraper')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        pages = self._load_pages(options['fixtures'], options['limit'])
+        if not pages:
+            raise CommandError("No recorded pages, scrape with SCRAPER_SNAPSHOTS on or pass --fixtures")
+
+        scraper_paths = options['scraper'] or DEFAULT_SCRAPERS
+        results = [self._run(path, pages, options['rounds']) for path in scraper_paths]
+
+        # Agreement with the first scraper, the reference
+        reference = results[0].pop("articles")
+        for result in results[1:]:
+            articles = result.pop("articles")
+            result["agreement"] = {
+                field: round(sum(
+                    1 for ours, theirs in zip(articles, reference)
+                    if (ours or {}).get(field) == (theirs or {}).get(field)
+                ) / len(pages), 3)
+                for field in FIELDS
+            }
+            result["speedup"] = round(result["pages_per_sec"] / results[0]["pages_per_sec"], 2) if results[0]["pages_per_sec"] else None
+
+        report = {"pages": len(pages), "rounds": options['rounds'], "results": results}
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{'scraper':<24}{'pages/s':>10}{'p50 (ms)':>10}{'p95 (ms)':>10}{'failed':>8}{'speedup':>9}")
+        for result in results:
+            self.stdout.write(
+                f"{result['scraper'].rsplit('.', 1)[-1]:<24}{result['pages_per_sec']:>10.1f}"
+                f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['failed']:>8}"
+                f"{result.get('speedup') or 1.0:>9.2f}"
+            )
+            if result.get("sources"):
+                self.stdout.write(f"    sources: {result['sources']}")
+            if result.get("agreement"):
+                self.stdout.write(f"    agrees with {results[0]['scraper'].rsplit('.', 1)[-1]}: {result['agreement']}")
+        self.stdout.write(self.style.SUCCESS(f"Parsed {len(pages)} pages {options['rounds']} times per scraper"))
+
+    def _load_pages(self, fixtures, limit):
+        """The raw bytes of the recorded article pages."""
+        if fixtures:
+            return [path.read_bytes() for path in sorted(Path(fixtures).glob("*.html"))]
+        snapshot_ids = [snapshot_id for _, snapshot_id in latest_fetches(kind="article")[-limit:]]
+        data = dict(Snapshot.objects.filter(id__in=snapshot_ids).values_list("id", "data"))
+        return [decompress(data[snapshot_id]) for snapshot_id in snapshot_ids]
+
+    def _run(self, scraper_path, pages, rounds):
+        scraper = import_string(scraper_path)()
+        latencies = []
+        articles = []
+        failed = 0
+
+        start = time.perf_counter()
+        for round_number in range(rounds):
+            for content in pages:
+                page_start = time.perf_counter()
+                try:
+                    article = scraper.parse_article(content)
+                except Exception:
+                    article = None
+                latencies.append((time.perf_counter() - page_start) * 1000)
+                if round_number == 0:
+                    articles.append(article)
+                    failed += not article or not article.get('title')
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        sources = getattr(scraper, 'stats', None)
+        return {
+            "scraper": scraper_path,
+            "pages_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))], 3),
+            "failed": failed,
+            # Counted over every round, divide by rounds for per-page numbers
+            "sources": {source: count // rounds for source, count in sources.items()} if sources else None,
+            "articles": articles,
+        }
@@ -0,0 +1,126 @@
+# sports_news/news/management/commands/reparse.py
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.dateparse import parse_datetime, parse_date
+from django.utils.module_loading import import_string
+from django.utils import timezone
+from news.models import Article, Snapshot
+from news.utils.reparse import init_worker, parse_snapshot
+from news.utils.scraper_base import ScraperBase
+from news.utils.snapshots import latest_fetches
+import statistics
+import datetime
+import json
+import time
+import os
+
+FIELDS = ("title", "description", "img_url")
+
+class Command(BaseCommand):
+    help = "Runs a scraper over the stored page snapshots, in parallel and without fetching anything"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scraper', default='news.utils.nhl_scraper.NHLScraper',
+                            help='Dotted path of the ScraperBase subclass to run')
+        parser.add_argument('--kind', choices=['article', 'index'], default='article',
+                            help='Parse article pages, or index pages with crawl_links')
+        parser.add_argument('--since', help='Only snapshots fetched on or after this date or datetime')
+        parser.add_argument('--url-prefix', help='Only snapshots of URLs starting with this')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Parser processes')
+        parser.add_argument('--batch-size', type=int, default=200, help='Snapshots loaded from the database at a time')
+        parser.add_argument('--update', action='store_true',
+                            help='Save changed titles, descriptions and images to the matching articles')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        scraper_path = options['scraper']
+        try:
+            scraper_class = import_string(scraper_path)
+        except ImportError as e:
+            raise CommandError(f"Could not import {scraper_path}: {e}")
+        if not (isinstance(scraper_class, type) and issubclass(scraper_class, ScraperBase)):
+            raise CommandError(f"{scraper_path} is not a ScraperBase subclass")
+
+        fetches = latest_fetches(kind=options['kind'], since=self._parse_since(options['since']), url_prefix=options['url_prefix'])
+        report = {"scraper": scraper_path, "kind": options['kind'], "pages": len(fetches),
+                  "parsed": 0, "failed": 0, "changed": 0, "updated": 0, "missing": 0, "errors": []}
+        timings = []
+
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        start_time = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=max(options['workers'], 1), initializer=init_worker) as executor:
+            for offset in range(0, len(fetches), options['batch_size']):
+                batch = fetches[offset:offset + options['batch_size']]
+                data = dict(Snapshot.objects.filter(id__in={snapshot_id for _, snapshot_id in batch}).values_list("id", "data"))
+                results = executor.map(
+                    parse_snapshot,
+                    [scraper_path] * len(batch),
+                    [options['kind']] * len(batch),
+                    [url for url, _ in batch],
+                    [bytes(data[snapshot_id]) for _, snapshot_id in batch],
+                    chunksize=max(len(batch) // (options['workers'] * 4), 1),
+                )
+                for result in results:
+                    timings.append(result["seconds"])
+                    self._record(result, report, options)
+        elapsed = time.perf_counter() - start_time
+
+        report["seconds"] = round(elapsed, 3)
+        report["pages_per_sec"] = round(len(fetches) / elapsed, 2) if elapsed else 0.0
+        report["parse_p50"] = statistics.median(timings) if timings else None
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for error in report["errors"]:
+            self.stdout.write(self.style.ERROR(f"{error['url']}: {error['error']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Parsed {report['parsed']} of {report['pages']} snapshots ({report['failed']} failed) with "
+            f"{options['workers']} workers in {report['seconds']:.1f}s, {report['pages_per_sec']} pages/s"
+        ))
+        if options['kind'] == 'index':
+            self.stdout.write(f"Found {report.get('links', 0)} links")
+        else:
+            self.stdout.write(
+                f"{report['changed']} differ from the stored articles, {report['updated']} updated, "
+                f"{report['missing']} have no article"
+            )
+
+    def _record(self, result, report, options):
+        """Count one worker result and compare it with the stored article."""
+        if "error" in result:
+            report["failed"] += 1
+            report["errors"].append({"url": result["url"], "error": result["error"]})
+            return
+        report["parsed"] += 1
+        if options['kind'] != 'article':
+            report["links"] = report.get("links", 0) + len(result["links"])
+            return
+
+        article = Article.objects.filter(link=ScraperBase._normalize_url(result["url"])).first()
+        if article is None:
+            report["missing"] += 1
+            return
+        changed = [field for field in FIELDS if result[field] and result[field] != getattr(article, field)]
+        if not changed:
+            return
+        report["changed"] += 1
+        if options['update']:
+            for field in changed:
+                setattr(article, field, result[field])
+            article.save(update_fields=changed)
+            report["updated"] += 1
+
+    @staticmethod
+    def _parse_since(value):
+        if not value:
+            return None
+        since = parse_datetime(value)
+        if since is None:
+            date = parse_date(value)
+            if date is None:
+                raise CommandError(f"Invalid --since: {value}")
+            since = datetime.datetime.combine(date, datetime.time.min)
+        return timezone.make_aware(since) if timezone.is_naive(since) else since
@@ -6,12 +6,24 @@ from news.news_scraper import NewsScraperService
 class Command(BaseCommand):
     help = 'Scrapes NHL news articles and adds them to the database'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--refresh', action='store_true',
+                            help='Check recently scraped articles for updates instead of scraping new ones')
+
     def handle(self, *args, **options):
-        self.stdout.write(self.style.SUCCESS(f'Starting NHL news scraper at {timezone.now()}'))
-        
         command_logger = CommandLogger(self)
         scraper_service = NewsScraperService(logger=command_logger)
         
+        if options['refresh']:
+            results = scraper_service.refresh_nhl_news()
+            if 'error' in results:
+                self.stdout.write(self.style.ERROR(f"Refresh failed with error: {results['error']}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Refresh complete, {results['articles_updated']} articles updated."))
+            return
+        
+        self.stdout.write(self.style.SUCCESS(f'Starting NHL news scraper at {timezone.now()}'))
+        
         results = scraper_service.scrape_nhl_news()
         
         if 'error' in results:
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_article_thumb_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='lease_token',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
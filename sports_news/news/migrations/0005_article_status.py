@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+def backfill_status(apps, schema_editor):
+    """Derive the status of existing rows from is_new and generated_text."""
+    Article = apps.get_model("news", "Article")
+    # Rows the uploader already took were posted or lost, there is no way to tell
+    Article.objects.filter(is_new=False).update(status="posted")
+    Article.objects.filter(is_new=True).exclude(generated_text="").update(status="generated")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_article_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='last_error',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='post_uri',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='posted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='status',
+            field=models.CharField(choices=[('scraped', 'Scraped'), ('generated', 'Generated'), ('queued', 'Queued'), ('posted', 'Posted'), ('failed', 'Failed')], default='scraped', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('status__in', ['scraped', 'generated'])), fields=['status', 'id'], name='article_pending_idx'),
+        ),
+        migrations.RunPython(backfill_status, migrations.RunPython.noop),
+    ]
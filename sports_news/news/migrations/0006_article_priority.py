@@ -0,0 +1,84 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+# A frozen copy of app.utils.priority as of this migration, so later changes to
+# the formula or the prompt categories don't change what the backfill computes
+CATEGORY_KEYWORDS = {
+    "contract": ["signs", "contract", "deal", "extension", "million", "$", "salary", "cap hit"],
+    "playoff": ["playoff", "stanley cup", "postseason", "elimination", "clinch", "wild-card", "wild card"],
+    "injury": ["injury", "injured", "out", "recovery", "miss", "upper-body", "lower-body", "concussion", "surgery"],
+    "game_preview": ["tonight", "face", "host", "visit", "matchup", "vs", "against", "seek", "aim", "go for", "series"],
+    "game_recap": ["win", "defeat", "beat", "edge", "victory", "score", "goals", "assists", "saves", "shutout", "surge past"],
+    "milestone": ["record", "milestone", "historic", "career", "youngest", "oldest", "first", "1st"],
+    "event": ["global series", "tournament", "event", "arena", "all-star", "festival", "heritage classic"],
+}
+INJURY_NEGATIVE_CONTEXT = ["st. patrick", "holiday", "gear", "event", "tournament"]
+CATEGORY_WEIGHTS = {
+    "contract": 3.0,
+    "playoff": 2.5,
+    "injury": 2.0,
+    "milestone": 2.0,
+    "game_recap": 1.0,
+    "event": 1.0,
+    "game_preview": 0.0,
+}
+BREAKING_KEYWORDS = ["trade", "traded", "acquire", "fired", "suspended", "retire", "breaking"]
+BREAKING_WEIGHT = 3.0
+SOURCE_WEIGHTS = {"article": 0.0, "video": 0.5}
+
+
+def get_priority(title, desc, source, published_at):
+    content = (title + " " + desc).lower()
+    scores = {
+        category: sum(keyword in content for keyword in keywords)
+        for category, keywords in CATEGORY_KEYWORDS.items()
+    }
+    scores["injury"] -= 2 * sum(context in content for context in INJURY_NEGATIVE_CONTEXT)
+
+    category = max(scores, key=scores.get)
+    if scores[category] <= 0:
+        category = "game_preview"
+    if "global series" in content:
+        category = "event"
+    if source == "video":
+        category = "game_recap"
+
+    importance = CATEGORY_WEIGHTS[category]
+    importance += min(max(scores[category] - 1, 0), 4) * 0.25
+    if any(keyword in content for keyword in BREAKING_KEYWORDS):
+        importance += BREAKING_WEIGHT
+    importance += SOURCE_WEIGHTS[source]
+    return round(published_at.timestamp() / 3600 + importance, 4)
+
+
+def backfill_priority(apps, schema_editor):
+    """Score the rows still waiting to be posted, using their scrape time."""
+    Article = apps.get_model("news", "Article")
+    for item in Article.objects.filter(status__in=["scraped", "generated"]):
+        item.priority = get_priority(item.title, item.description, source="article", published_at=item.timestamp)
+        item.save(update_fields=["priority"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_article_status'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='article_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='priority',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_priority, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('status__in', ['scraped', 'generated'])), fields=['status', '-priority'], name='article_pending_idx'),
+        ),
+    ]
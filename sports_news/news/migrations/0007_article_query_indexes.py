@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_article_priority'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('lease_token__isnull', False)), fields=['lease_token'], name='article_lease_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('status', 'failed')), fields=['-timestamp'], name='article_failed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-timestamp'], name='article_timestamp_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_article_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Snapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField()),
+                ('compressed_size', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SnapshotFetch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=1000)),
+                ('kind', models.CharField(choices=[('index', 'Index'), ('article', 'Article')], max_length=10)),
+                ('fetched_at', models.DateTimeField(auto_now_add=True)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fetches', to='news.snapshot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'url', '-fetched_at'], name='news_snapsh_kind_6c3381_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:35
+
+from django.db import migrations, models
+
+
+def schedule_recent(apps, schema_editor):
+    """Revisit the articles scraped within the refresh window, older ones are left alone."""
+    from django.conf import settings
+    from django.utils import timezone
+    from datetime import timedelta
+
+    Article = apps.get_model("news", "Article")
+    now = timezone.now()
+    window = timedelta(hours=getattr(settings, 'ARTICLE_REFRESH_WINDOW_HOURS', 72))
+    Article.objects.filter(timestamp__gte=now - window).update(next_check_at=now)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='last_modified',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='next_check_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='page_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='unchanged_checks',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('next_check_at__isnull', False)), fields=['next_check_at'], name='article_refresh_idx'),
+        ),
+        migrations.RunPython(schedule_recent, migrations.RunPython.noop),
+    ]
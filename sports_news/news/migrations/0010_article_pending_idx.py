@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_article_refresh'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='article_pending_idx',
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('status__in', ['scraped', 'generated'])), fields=['-priority', 'id'], name='article_pending_idx'),
+        ),
+    ]
@@ -7,6 +7,108 @@ class Article(models.Model):
     img_url = models.URLField(default=None)
     timestamp = models.DateTimeField(auto_now_add=True)
     is_new = models.BooleanField(default=True)
+    generated_text = models.TextField(blank=True, default="")
+    generated_model = models.CharField(max_length=50, blank=True, default="")
+    generation_latency = models.FloatField(null=True, blank=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+    thumb_status = models.CharField(max_length=10, default="pending", choices=[
+        ("pending", "Pending"),
+        ("ready", "Ready"),
+        ("uploaded", "Uploaded"),
+        ("failed", "Failed"),
+    ])
+    thumb_error = models.CharField(max_length=255, blank=True, default="")
+    thumb_checked_at = models.DateTimeField(null=True, blank=True)
+    lease_token = models.UUIDField(null=True, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=10, default="scraped", choices=[
+        ("scraped", "Scraped"),
+        ("generated", "Generated"),
+        ("queued", "Queued"),
+        ("posted", "Posted"),
+        ("failed", "Failed"),
+    ])
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.CharField(max_length=500, blank=True, default="")
+    post_uri = models.CharField(max_length=255, blank=True, default="")
+    posted_at = models.DateTimeField(null=True, blank=True)
+    # Publish time in hours plus importance, see app.utils.priority
+    priority = models.FloatField(default=0)
+    # Change detection, see ScraperBase.refresh: the hash of the raw page, the
+    # hash of the fields we extract from it and the page's HTTP validators
+    page_hash = models.CharField(max_length=64, blank=True, default="")
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    checked_at = models.DateTimeField(null=True, blank=True)
+    # None once the article is too old to be revisited
+    next_check_at = models.DateTimeField(null=True, blank=True)
+    unchanged_checks = models.PositiveSmallIntegerField(default=0)
+
+    # Statuses the uploader still has to pick up
+    PENDING_STATUSES = ("scraped", "generated")
+
+    class Meta:
+        indexes = [
+            # Articles still being revisited for updates
+            models.Index(
+                fields=["next_check_at"],
+                condition=models.Q(next_check_at__isnull=False),
+                name="article_refresh_idx",
+            ),
+            # Only pending rows are indexed, in claim order, so the uploader's scan doesn't grow with the posted history
+            models.Index(
+                fields=["-priority", "id"],
+                condition=models.Q(status__in=["scraped", "generated"]),
+                name="article_pending_idx",
+            ),
+            # Rows a batch has leased, only set while an upload holds them
+            models.Index(
+                fields=["lease_token"],
+                condition=models.Q(lease_token__isnull=False),
+                name="article_lease_idx",
+            ),
+            # requeue_failed and the admin's failed filter
+            models.Index(
+                fields=["-timestamp"],
+                condition=models.Q(status="failed"),
+                name="article_failed_idx",
+            ),
+            # The admin's newest-first changelist
+            models.Index(fields=["-timestamp"], name="article_timestamp_idx"),
+        ]
 
     def __str__(self):
         return self.title
+
+class Snapshot(models.Model):
+    """
+    A fetched page, zstd-compressed and identified by the hash of its bytes, so
+    a page fetched again unchanged is stored once.
+    """
+    content_hash = models.CharField(max_length=64, unique=True)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField()
+    compressed_size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.content_hash
+
+class SnapshotFetch(models.Model):
+    """One fetch of a URL by a scraper and the Snapshot of what it returned."""
+    url = models.URLField(max_length=1000)
+    kind = models.CharField(max_length=10, choices=[
+        ("index", "Index"),
+        ("article", "Article"),
+    ])
+    snapshot = models.ForeignKey(Snapshot, on_delete=models.CASCADE, related_name="fetches")
+    fetched_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "url", "-fetched_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.url} at {self.fetched_at}"
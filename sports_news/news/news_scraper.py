@@ -1,5 +1,6 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
 from django.utils.timezone import now
-from news.utils.nhl_scraper import NHLScraper
 
 class NewsScraperService:
     """
@@ -31,6 +32,11 @@ class NewsScraperService:
         else:
             print(f"ERROR: {message}")
     
+    @staticmethod
+    def get_scraper():
+        """The NHL.com scraper set by NEWS_SCRAPER_CLASS."""
+        return import_string(getattr(settings, 'NEWS_SCRAPER_CLASS', 'news.utils.nhl_scraper.NHLScraper'))()
+
     def scrape_nhl_news(self):
         """
         Scrape news articles from NHL.com.
@@ -40,7 +46,7 @@ class NewsScraperService:
         """
         try:
             self.log_info("Initializing NHL news scraper")
-            scraper = NHLScraper()
+            scraper = self.get_scraper()
             
             self.log_info("Starting scraping process")
             results = scraper.run()
@@ -58,7 +64,8 @@ class NewsScraperService:
             return {
                 "timestamp": str(now()),
                 "articles_scraped": results['count'],
-                "titles": results.get('titles', [])
+                "titles": results.get('titles', []),
+                "article_ids": results.get('ids', [])
             }
             
         except Exception as e:
@@ -72,4 +79,42 @@ class NewsScraperService:
                 "articles_scraped": 0,
                 "error": str(e),
                 "traceback": error_traceback
-            }
\ No newline at end of file
+            }
+
+    def refresh_nhl_news(self):
+        """
+        Revisit recent NHL.com articles and update the ones that changed.
+        
+        Returns:
+            Dict containing timestamp, counts per outcome and the updated titles.
+        """
+        try:
+            scraper = self.get_scraper()
+            results = scraper.refresh()
+            
+            self.log_info(
+                f"Checked articles: {results['updated']} updated, {results['unchanged']} unchanged, "
+                f"{results['not_modified']} not modified, {results['gone']} gone, {results['failed']} failed"
+            )
+            for title in results['titles']:
+                self.log_info(f'- {title}')
+            
+            return {
+                "timestamp": str(now()),
+                "articles_updated": results['updated'],
+                "article_ids": results['ids'],
+                "checks": {outcome: results[outcome] for outcome in ('not_modified', 'unchanged', 'updated', 'gone', 'failed')},
+            }
+            
+        except Exception as e:
+            import traceback
+            error_traceback = traceback.format_exc()
+            self.log_error(f"Error refreshing NHL articles: {e}")
+            self.log_error(error_traceback)
+            
+            return {
+                "timestamp": str(now()),
+                "articles_updated": 0,
+                "error": str(e),
+                "traceback": error_traceback
+            }
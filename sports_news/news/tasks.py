@@ -1,16 +1,35 @@
 # sports_news/news/tasks.py
 from celery import shared_task
 from news.news_scraper import NewsScraperService
+from app.tasks import pregenerate_posts, prefetch_thumbnails
+from app.utils.locks import single_flight
 import logging
 
 logger = logging.getLogger(__name__)
 
 @shared_task
+@single_flight("scrape_nhl_news")
 def scrape_nhl_news():
     """Celery task to scrape NHL news and add them to the database"""
     task_logger = TaskLogger()
     scraper_service = NewsScraperService(logger=task_logger)
-    return scraper_service.scrape_nhl_news()
+    results = scraper_service.scrape_nhl_news()
+    
+    # Generate post text and prepare thumbnails for the new rows while the worker would otherwise be idle
+    if results.get("article_ids"):
+        prefetch_thumbnails.delay(article_ids=results["article_ids"], video_ids=[])
+        # The upload is triggered when pre-generation finishes, so it only posts
+        pregenerate_posts.delay(article_ids=results["article_ids"], video_ids=[], then_upload=True)
+    
+    return results
+
+@shared_task
+@single_flight("refresh_nhl_news")
+def refresh_nhl_news():
+    """Celery task to revisit recent NHL articles with conditional GETs and update changed ones"""
+    task_logger = TaskLogger()
+    scraper_service = NewsScraperService(logger=task_logger)
+    return scraper_service.refresh_nhl_news()
 
 class TaskLogger:
     """Logger adapter for Celery tasks that logs to the Celery logger"""
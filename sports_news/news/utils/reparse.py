@@ -0,0 +1,54 @@
+"""
+Worker side of `manage.py reparse`.
+
+The functions here run in a process pool. They only receive snapshot bytes
+from the parent and return plain dicts, so workers never touch the database
+or the network. Nothing is imported at module level that needs Django to be
+set up, since a spawned worker imports this module before init_worker runs.
+"""
+from functools import lru_cache
+import time
+
+def init_worker():
+    """Set up Django in a worker that didn't inherit it from the parent."""
+    from django.apps import apps
+
+    if not apps.ready:
+        import django
+
+        django.setup()
+
+@lru_cache(maxsize=None)
+def get_scraper(scraper_path):
+    """The scraper instance for a dotted class path, one per worker process."""
+    from django.utils.module_loading import import_string
+
+    return import_string(scraper_path)()
+
+def parse_snapshot(scraper_path, kind, url, data):
+    """
+    Run a scraper over one compressed snapshot.
+
+    Returns:
+        dict: The fields the scraper extracted, or the error it raised
+    """
+    from bs4 import BeautifulSoup
+    import zstandard
+
+    start_time = time.perf_counter()
+    result = {"url": url}
+    try:
+        scraper = get_scraper(scraper_path)
+        content = zstandard.ZstdDecompressor().decompress(bytes(data))
+        if kind == "index":
+            result["links"] = scraper.crawl_links(BeautifulSoup(content, 'html.parser'))
+        else:
+            # The same entry point as a live scrape, so subclasses that override it are re-run too
+            article = scraper.parse_article(content) or {}
+            result["title"] = article.get("title", "")
+            result["description"] = article.get("description", "")
+            result["img_url"] = article.get("img_url")
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start_time, 4)
+    return result
@@ -2,6 +2,18 @@ from abc import ABC, abstractmethod
 from bs4 import BeautifulSoup
 import requests
 from news.models import Article
+from app.utils.priority import get_priority
+from app.archive import is_archived
+from news.utils.snapshots import save_snapshot
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
+
+def article_hash(title, description, img_url):
+    """Hash of the fields we extract from an article page, to tell real updates from page noise."""
+    return hashlib.sha256("\x1f".join((title or "", description or "", img_url or "")).encode()).hexdigest()
 
 class ScraperBase(ABC):
     """
@@ -26,26 +38,54 @@ class ScraperBase(ABC):
         self.url = url
 
     @staticmethod
-    def _req_page(url: str) -> BeautifulSoup:
+    def _req_page(url: str, kind: str = "article") -> BeautifulSoup:
         """
         Request a webpage and parse it with BeautifulSoup.
         
+        The raw page is also kept as a compressed snapshot, see news.utils.snapshots,
+        so it can be parsed again later by the reparse command without fetching it.
+        
         Args:
             url (str): The URL to request
+            kind (str): "index" for the page links are crawled from, "article" otherwise
             
         Returns:
             BeautifulSoup: Parsed HTML content or None if request failed
         """
+        response = ScraperBase._fetch(url, kind=kind)
+        if response is None:
+            return None
+        if response.status_code != 200:
+            print(f"Failed to retrieve page: {response.status_code}")
+            return None
+        return BeautifulSoup(response.content, 'html.parser')
+
+    @staticmethod
+    def _fetch(url: str, kind: str = "article", headers: dict = None):
+        """
+        GET a page, keeping a snapshot of it if it was returned in full.
+        
+        Args:
+            url (str): The URL to request
+            kind (str): "index" for the page links are crawled from, "article" otherwise
+            headers (dict): Extra request headers, e.g. conditional GET validators
+            
+        Returns:
+            requests.Response: The response, or None if the request failed
+        """
         try:
-            response = requests.get(url)
-            if response.status_code != 200:
-                print(f"Failed to retrieve page: {response.status_code}")
-            else:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                return soup
+            response = requests.get(url, headers=headers or {}, timeout=30)
         except Exception as e:
             print(f"Error fetching page content: {e}")
             return None
+        if response.status_code == 200 and getattr(settings, 'SCRAPER_SNAPSHOTS', True):
+            try:
+                # Its own savepoint, a failed insert mustn't break the caller's transaction
+                with transaction.atomic():
+                    save_snapshot(url, response.content, kind=kind)
+            except Exception as e:
+                print(f"Error saving snapshot of {url}: {e}")
+        return response
         
     @staticmethod
     def _normalize_url(url):
@@ -61,12 +101,13 @@ class ScraperBase(ABC):
         """Improved run method with transaction and better error handling"""
         from django.db import transaction
         
-        main_page = self._req_page(self.url)
+        main_page = self._req_page(self.url, kind="index")
         if not main_page:
-            return {'count': 0, 'titles': []}
+            return {'count': 0, 'titles': [], 'ids': []}
             
         target_links = self.crawl_links(main_page)
         titles = []
+        ids = []
         count = 0
 
         for link in target_links:
@@ -76,30 +117,194 @@ class ScraperBase(ABC):
             # Use transactions to prevent race conditions
             with transaction.atomic():
                 # Check again inside transaction to prevent race conditions
-                if Article.objects.filter(link=normalized_link).exists():
+                if Article.objects.filter(link=normalized_link).exists() or is_archived("article", normalized_link):
                     continue
                     
-                article_page = self._req_page(link)
-                if not article_page:
+                response = self._fetch(link)
+                if response is None or response.status_code != 200:
                     continue
 
-                article = self.scrape_page(article_page)
-                img = self.extract_thumbnail(article_page)
+                article = self.parse_article(response.content)
+                img = article.get('img_url') if article else None
                 
                 if article and img and article['description']:
-                    Article.objects.create(
+                    created = Article.objects.create(
                         title=article['title'],
                         description=article['description'],
                         link=normalized_link,
                         img_url=img,
-                        is_new=True
+                        is_new=True,
+                        priority=get_priority(article['title'], article['description'], source="article"),
+                        **self._check_state(response, article_hash(article['title'], article['description'], img))
                     )
                     titles.append(f"Uploaded: {article['title']}")
+                    ids.append(created.id)
                     count += 1
                     
         return {
             'count': count,
-            'titles': titles
+            'titles': titles,
+            'ids': ids
+        }
+
+    def parse_article(self, content: bytes) -> dict:
+        """
+        Extract the fields of an article from the raw page.
+        
+        Parses the page with BeautifulSoup and hands it to scrape_page and
+        extract_thumbnail; subclasses can override this to read the page some
+        other way.
+        
+        Args:
+            content (bytes): The page as fetched
+            
+        Returns:
+            dict: title, description and img_url, or None if the page has no article
+        """
+        page = BeautifulSoup(content, 'html.parser')
+        article = self.scrape_page(page)
+        if not article:
+            return None
+        return {**article, 'img_url': self.extract_thumbnail(page)}
+
+    def refresh(self, limit: int = None) -> dict:
+        """
+        Revisit recently scraped articles whose next check is due, updating the ones that changed.
+        
+        Each check is a conditional GET with the article's ETag and Last-Modified,
+        and a page is only parsed if its bytes differ from the last fetch. Checks
+        back off while an article doesn't change, and stop once it is older than
+        ARTICLE_REFRESH_WINDOW_HOURS.
+        
+        Args:
+            limit (int): Articles to check, ARTICLE_REFRESH_BATCH_SIZE by default
+            
+        Returns:
+            dict: Counts per outcome and the ids and titles of updated articles
+        """
+        limit = limit or getattr(settings, 'ARTICLE_REFRESH_BATCH_SIZE', 50)
+        due = Article.objects.filter(next_check_at__lte=timezone.now()).order_by("next_check_at")[:limit]
+        report = {'not_modified': 0, 'unchanged': 0, 'updated': 0, 'gone': 0, 'failed': 0, 'ids': [], 'titles': []}
+
+        for article in due:
+            try:
+                outcome = self.refresh_article(article)
+            except Exception as e:
+                print(f"Error refreshing {article.link}: {e}")
+                outcome = 'failed'
+            report[outcome] += 1
+            if outcome == 'updated':
+                report['ids'].append(article.id)
+                report['titles'].append(f"Updated: {article.title}")
+        return report
+
+    def refresh_article(self, article: Article) -> str:
+        """
+        Check one article for changes and schedule its next check.
+        
+        Returns:
+            str: "not_modified" (304), "unchanged", "updated", "gone" (404/410) or "failed"
+        """
+        headers = {}
+        if article.etag:
+            headers['If-None-Match'] = article.etag
+        if article.last_modified:
+            headers['If-Modified-Since'] = article.last_modified
+        response = self._fetch(article.link, headers=headers)
+
+        fields = ['checked_at', 'next_check_at', 'unchanged_checks']
+        if response is None:
+            outcome = 'failed'
+        elif response.status_code == 304:
+            outcome = 'not_modified'
+        elif response.status_code in (404, 410):
+            outcome = 'gone'
+        elif response.status_code != 200:
+            outcome = 'failed'
+        elif hashlib.sha256(response.content).hexdigest() == article.page_hash:
+            outcome = 'unchanged'
+        else:
+            outcome = self._apply_update(article, response, fields)
+
+        if response is not None and response.status_code in (200, 304):
+            for field, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified')):
+                # A 304 may leave out validators that haven't changed
+                value = response.headers.get(header)
+                if value or response.status_code == 200:
+                    setattr(article, field, (value or '')[:Article._meta.get_field(field).max_length])
+            fields += ['etag', 'last_modified']
+
+        article.unchanged_checks = 0 if outcome == 'updated' else article.unchanged_checks + 1
+        article.checked_at = timezone.now()
+        article.next_check_at = None if outcome == 'gone' else self._next_check(article)
+        article.save(update_fields=fields)
+        return outcome
+
+    def _apply_update(self, article, response, fields):
+        """Parse a page whose bytes changed and copy its fields to the article if they did too."""
+        parsed = self.parse_article(response.content)
+        if not parsed or not parsed.get('title') or not parsed.get('description'):
+            # Leave page_hash alone so the page is parsed again next time
+            return 'failed'
+        article.page_hash = hashlib.sha256(response.content).hexdigest()
+        fields.append('page_hash')
+        img = parsed.get('img_url') or article.img_url
+        new_hash = article_hash(parsed['title'], parsed['description'], img)
+        # Articles scraped before change detection have no hash yet
+        old_hash = article.content_hash or article_hash(article.title, article.description, article.img_url)
+        if new_hash == old_hash:
+            if not article.content_hash:
+                article.content_hash = new_hash
+                fields.append('content_hash')
+            return 'unchanged'
+
+        # article was read before the fetch, the uploader or generator may have moved it
+        # on since, so status changes are conditional updates rather than saved fields
+        pending = Article.objects.filter(id=article.id, status__in=Article.PENDING_STATUSES)
+        if img != article.img_url and pending.update(thumb_status="pending"):
+            # The prepared thumbnail is for the old image
+            article.thumb_status = "pending"
+        article.title = parsed['title']
+        article.description = parsed['description']
+        article.img_url = img
+        article.content_hash = new_hash
+        fields += ['title', 'description', 'img_url', 'content_hash']
+
+        if article.status in Article.PENDING_STATUSES:
+            # Not posted yet, so the post should reflect the update
+            article.priority = get_priority(article.title, article.description, source="article", published_at=article.timestamp)
+            fields.append('priority')
+        # Regenerate text written for the old content, even if it was generated during
+        # the fetch. Same guard as the generator, text of a leased item may already be queued
+        reset = Article.objects.filter(id=article.id, status="generated", lease_token__isnull=True).update(
+            status="scraped", generated_text=""
+        )
+        if reset:
+            article.status = "scraped"
+            article.generated_text = ""
+        return 'updated'
+
+    @staticmethod
+    def _next_check(article):
+        """Double the interval for every check that found nothing new, up to ARTICLE_REFRESH_MAX_SECONDS."""
+        window = timedelta(hours=getattr(settings, 'ARTICLE_REFRESH_WINDOW_HOURS', 72))
+        if timezone.now() - article.timestamp > window:
+            return None
+        base = getattr(settings, 'ARTICLE_REFRESH_BASE_SECONDS', 900)
+        interval = min(base * 2 ** min(article.unchanged_checks, 16), getattr(settings, 'ARTICLE_REFRESH_MAX_SECONDS', 21600))
+        return timezone.now() + timedelta(seconds=interval)
+
+    @staticmethod
+    def _check_state(response, content_hash):
+        """Change detection fields for a newly scraped article."""
+        now = timezone.now()
+        return {
+            'page_hash': hashlib.sha256(response.content).hexdigest(),
+            'content_hash': content_hash,
+            'etag': response.headers.get('ETag', '')[:255],
+            'last_modified': response.headers.get('Last-Modified', '')[:64],
+            'checked_at': now,
+            'next_check_at': now + timedelta(seconds=getattr(settings, 'ARTICLE_REFRESH_BASE_SECONDS', 900)),
         }
 
     @abstractmethod  
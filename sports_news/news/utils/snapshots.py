@@ -0,0 +1,92 @@
+from news.models import Snapshot, SnapshotFetch
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from datetime import timedelta
+import hashlib
+
+COMPRESSION_LEVEL = 10
+
+def save_snapshot(url, content, kind="article"):
+    """
+    Store the bytes fetched from url and record the fetch.
+
+    Pages are stored by the sha256 of their bytes, so a page that hasn't
+    changed since the last fetch only adds a SnapshotFetch row.
+
+    Returns:
+        SnapshotFetch: The recorded fetch
+    """
+    import zstandard
+
+    content_hash = hashlib.sha256(content).hexdigest()
+    snapshot = Snapshot.objects.filter(content_hash=content_hash).first()
+    if snapshot is None:
+        data = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(content)
+        try:
+            with transaction.atomic():
+                snapshot = Snapshot.objects.create(
+                    content_hash=content_hash,
+                    data=data,
+                    size=len(content),
+                    compressed_size=len(data),
+                )
+        except IntegrityError:
+            # Stored by a concurrent scrape in the meantime
+            snapshot = Snapshot.objects.get(content_hash=content_hash)
+    return SnapshotFetch.objects.create(url=url, kind=kind, snapshot=snapshot)
+
+def decompress(data):
+    """The page bytes of a Snapshot's data."""
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompress(bytes(data))
+
+def latest_fetches(kind="article", since=None, url_prefix=None):
+    """
+    The most recent fetch of each URL.
+
+    Returns:
+        list: (url, snapshot id) pairs, ordered by URL
+    """
+    fetches = SnapshotFetch.objects.filter(kind=kind)
+    if since:
+        fetches = fetches.filter(fetched_at__gte=since)
+    if url_prefix:
+        fetches = fetches.filter(url__startswith=url_prefix)
+
+    latest = {}
+    # Ordered oldest first, so each URL ends up with its latest snapshot
+    for url, snapshot_id in fetches.order_by("url", "fetched_at").values_list("url", "snapshot_id").iterator():
+        latest[url] = snapshot_id
+    return sorted(latest.items())
+
+def prune_snapshots(days=None, batch_size=None):
+    """
+    Delete fetches and snapshots older than SNAPSHOT_RETENTION_DAYS.
+
+    The latest fetch of each URL is kept however old it is, so every URL can
+    still be reparsed. Snapshots no fetch refers to any more are deleted too.
+    Rows are deleted in batches of batch_size, each in its own short transaction.
+
+    Returns:
+        dict: Deleted fetches and snapshots
+    """
+    days = days if days is not None else getattr(settings, 'SNAPSHOT_RETENTION_DAYS', 30)
+    batch_size = batch_size or getattr(settings, 'ARCHIVE_BATCH_SIZE', 500)
+    cutoff = timezone.now() - timedelta(days=days)
+
+    newer = SnapshotFetch.objects.filter(kind=OuterRef("kind"), url=OuterRef("url"), fetched_at__gt=OuterRef("fetched_at"))
+    old_fetches = SnapshotFetch.objects.filter(Exists(newer), fetched_at__lt=cutoff)
+    unused = Snapshot.objects.filter(~Exists(SnapshotFetch.objects.filter(snapshot=OuterRef("pk"))), created_at__lt=cutoff)
+
+    report = {"fetches": 0, "snapshots": 0}
+    for name, queryset in (("fetches", old_fetches), ("snapshots", unused)):
+        while True:
+            ids = list(queryset.values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                report[name] += queryset.model.objects.filter(id__in=ids).delete()[1].get(queryset.model._meta.label, 0)
+    return report
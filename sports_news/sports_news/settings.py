@@ -139,12 +139,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CELERY_BROKER_URL = os.getenv('CELERY_URL')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
+CELERY_RESULT_SERIALIZER = 'json'
+# Upload batches aggregate their per-item chains with a chord, which needs a result backend
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+CELERY_RESULT_EXPIRES = 24 * 3600
+
+# Scrapes, thumbnails and posting are I/O bound and run on the "io" queue, served by
+# its own prefork pool (not threads, which ignore the task time limits). LLM generation
+# holds a model slot for minutes and runs on the "llm" queue, served by a small prefork
+# pool sized to the model (see start_services.sh), so a long generation never delays a scrape
+CELERY_TASK_DEFAULT_QUEUE = 'io'
+
+CELERY_TASK_ROUTES = {
+    'app.tasks.generate_item_text': {'queue': 'llm'},
+    'app.tasks.pregenerate_posts': {'queue': 'llm'},
+    'news.tasks.*': {'queue': 'io'},
+    'highlights.tasks.*': {'queue': 'io'},
+    'app.tasks.*': {'queue': 'io'},
+}
 
 CELERY_BEAT_SCHEDULE = {
     'scrape_nhl_news_every_hour': {
         'task': 'news.tasks.scrape_nhl_news',  # Replace with the correct task path
         'schedule': crontab(minute=30, hour='*'),  # Runs every hour on the hour
     },
+    'refresh_nhl_news_every_10_minutes': {
+        'task': 'news.tasks.refresh_nhl_news',
+        'schedule': crontab(minute='*/10'),  # Only articles whose check is due are fetched
+    },
     'scrape_youtube_videos_every_hour': {
         'task': 'highlights.tasks.scrape_youtube_videos',  # Replace with the correct task path
         'schedule': crontab(minute=45, hour='*'),  # Runs every hour on the hour
@@ -153,4 +175,151 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'app.tasks.upload_to_bluesky',  # Replace with the correct task path
         'schedule': crontab(minute=0, hour='*'),  # Runs every hour on the hour
     },
-}
\ No newline at end of file
+    'dispatch_posts_every_minute': {
+        'task': 'app.tasks.drain_post_queue',
+        'schedule': crontab(minute='*'),  # Sends queued posts as their slots come up
+    },
+    'archive_old_items_daily': {
+        'task': 'app.tasks.archive_old_items',
+        'schedule': crontab(minute=15, hour=4),  # Off-peak, between the hourly scrapes
+    },
+}
+
+# Logging
+# LLM and Bluesky debug output is only emitted when LLM_LOG_LEVEL=DEBUG
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'loggers': {
+        'app.utils': {
+            'level': os.getenv('LLM_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+
+# Import time budgets per entry point, checked by `manage.py import_report --check`
+
+IMPORT_TIME_BUDGETS_MS = {
+    'scrape_articles': 800,
+    'scrape_videos': 700,
+    'upload': 800,
+    'worker': 900,
+}
+
+
+# Thumbnails
+# Cached thumbnail URLs are reused without any request for this many seconds,
+# after that they are revalidated with a conditional GET
+
+THUMBNAIL_REVALIDATE_AFTER = 24 * 3600
+
+# Thumbnails are downsized to fit THUMBNAIL_MAX_SIZE and recompressed to about
+# THUMBNAIL_MAX_BYTES; sources over THUMBNAIL_MAX_SOURCE_BYTES are not downloaded
+# and nothing over the PDS blob limit is uploaded
+
+THUMBNAIL_MAX_SIZE = (1200, 1200)
+THUMBNAIL_MAX_BYTES = 300 * 1000
+THUMBNAIL_MAX_SOURCE_BYTES = 15 * 1024 * 1024
+THUMBNAIL_BLOB_LIMIT = 1000 * 1000
+
+# Thumbnails are prepared right after scraping; with THUMBNAIL_PREUPLOAD they are
+# also uploaded then, so posting only references the blob. Leave it off if the PDS
+# garbage collects unreferenced blobs before the next upload run
+
+THUMBNAIL_PREUPLOAD = os.getenv('THUMBNAIL_PREUPLOAD', 'false').lower() in ('1', 'true', 'yes')
+
+# Posting queue
+# Sends keep POST_RATE_LIMIT_RESERVE requests of every PDS rate-limit window
+# unused and are at least POST_MIN_INTERVAL seconds apart. A run waits up to
+# POST_MAX_WAIT_SECONDS for a window to reset, otherwise the remaining posts
+# are left for the next run. Transient failures are retried with exponential
+# backoff starting at POST_RETRY_BASE_SECONDS, up to POST_MAX_ATTEMPTS times
+
+POST_RATE_LIMIT_RESERVE = 5
+POST_MIN_INTERVAL = 1.0
+POST_MAX_WAIT_SECONDS = 60
+POST_MAX_ATTEMPTS = 5
+POST_RETRY_BASE_SECONDS = 30
+POST_RETRY_MAX_SECONDS = 3600
+
+# Queued posts get send slots POST_MIN_SPACING_SECONDS apart or at
+# POST_TARGET_PER_HOUR, whichever is slower, and are sent by the every-minute
+# dispatcher. Set POST_DRIP_FEED = False to send everything as soon as it's queued.
+# At most POST_MAX_QUEUE_DEPTH posts wait for a slot (6 hours at 12 per hour),
+# the lowest priority ones past it are dropped and marked failed, 0 keeps them all
+
+POST_DRIP_FEED = True
+POST_TARGET_PER_HOUR = 12
+POST_MIN_SPACING_SECONDS = 120
+POST_MAX_QUEUE_DEPTH = 72
+
+# A due post gives its slot to one queued behind it whose priority is more than
+# POST_PROMOTE_MARGIN higher (priorities are in hours of freshness), at most
+# POST_MAX_DISPLACEMENTS times, so older posts still go out
+
+POST_PROMOTE_MARGIN = 1.0
+POST_MAX_DISPLACEMENTS = 2
+
+# Before a post is retried, the last POST_DEDUPE_SCAN_LIMIT posts on our own
+# feed are checked for its link in case the earlier attempt went through.
+# The scan is cached for POST_DEDUPE_CACHE_SECONDS
+
+POST_DEDUPE_SCAN_LIMIT = 100
+POST_DEDUPE_CACHE_SECONDS = 30
+
+# Uploads claim up to UPLOAD_BATCH_SIZE new items per model with a lease of
+# UPLOAD_LEASE_SECONDS, renewed for each item as every stage of its upload starts;
+# items whose lease expires are claimed by the next run. Keep it at least as long
+# as the slowest stage's time limit (generation, 900 seconds)
+
+UPLOAD_BATCH_SIZE = 50
+UPLOAD_LEASE_SECONDS = 900
+
+# Scraper used for NHL.com. The structured-data scraper reads the JSON-LD in
+# article pages and falls back to the HTML one. It stays opt-in until
+# `manage.py benchmark_scrapers` shows both agree on recorded pages
+
+NEWS_SCRAPER_CLASS = os.getenv('NEWS_SCRAPER_CLASS', 'news.utils.nhl_scraper.NHLScraper')
+
+# Pages fetched by the article scrapers are kept as compressed snapshots for
+# `manage.py reparse`; set SCRAPER_SNAPSHOTS=false to turn this off
+
+SCRAPER_SNAPSHOTS = os.getenv('SCRAPER_SNAPSHOTS', 'true').lower() in ('1', 'true', 'yes')
+
+# Snapshots and fetches older than SNAPSHOT_RETENTION_DAYS are pruned by the daily
+# archive task, except the latest fetch of each URL
+
+SNAPSHOT_RETENTION_DAYS = int(os.getenv('SNAPSHOT_RETENTION_DAYS', '30'))
+
+# Articles are revisited for updates with conditional GETs, first after
+# ARTICLE_REFRESH_BASE_SECONDS and then twice as long after each check that
+# finds no change, up to ARTICLE_REFRESH_MAX_SECONDS. Checks stop once an
+# article is ARTICLE_REFRESH_WINDOW_HOURS old
+
+ARTICLE_REFRESH_BASE_SECONDS = 900
+ARTICLE_REFRESH_MAX_SECONDS = 21600
+ARTICLE_REFRESH_WINDOW_HOURS = 72
+ARTICLE_REFRESH_BATCH_SIZE = 50
+
+# Posted and failed items scraped more than ARCHIVE_AFTER_DAYS ago are moved
+# into compressed archive rows by a daily task, ARCHIVE_BATCH_SIZE rows per
+# transaction and at most ARCHIVE_MAX_BATCHES batches per run
+
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '90'))
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_BATCH_PAUSE = 0.1
+ARCHIVE_MAX_BATCHES = 200
+
+# Scrape and upload tasks take a Redis lock so overlapping runs are skipped (or, for
+# uploads, merged into one rerun). The lock lease is renewed by a heartbeat and lapses
+# SINGLE_FLIGHT_LEASE_SECONDS after a worker dies
+
+LOCK_REDIS_URL = os.getenv('LOCK_REDIS_URL', CELERY_BROKER_URL)
+SINGLE_FLIGHT_LEASE_SECONDS = 60
+
+# Scrapes that insert rows schedule an upload this many seconds later; scrapes in
+# the same window share it. The hourly upload stays as a safety net
+
+UPLOAD_DEBOUNCE_SECONDS = 90
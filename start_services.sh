@@ -5,7 +5,13 @@ BASE_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 DJANGO_APP_DIR="${BASE_DIR}/sports_news"
 LOG_DIR="${BASE_DIR}/logs"
 VENV_DIR="${BASE_DIR}/.venv"
-CELERY_WORKERS=1  # Hardcoded to 1 to avoid unnecessary memory usage
+# I/O worker: scrapes, thumbnails and posting. Prefork rather than threads, the threads
+# pool ignores soft_time_limit/time_limit, so a hung request would hold a slot forever
+CELERY_IO_CONCURRENCY="${CELERY_IO_CONCURRENCY:-8}"
+# LLM worker: one process per generation the model server can run at once
+CELERY_LLM_CONCURRENCY="${CELERY_LLM_CONCURRENCY:-${OLLAMA_NUM_PARALLEL:-1}}"
+# Recycle an LLM worker child once it grows past this many KB (LangChain and clients stay resident)
+CELERY_LLM_MAX_MEMORY_KB="${CELERY_LLM_MAX_MEMORY_KB:-524288}"
 
 # Create log directory if it doesn't exist
 mkdir -p "$LOG_DIR"
@@ -149,38 +155,63 @@ restart_celery_worker() {
     fi
     
     # Clear any leftover pid files that might cause issues
-    rm -f "${DJANGO_APP_DIR}/celery.pid" 2>/dev/null
+    rm -f "${DJANGO_APP_DIR}/celery.pid" "${DJANGO_APP_DIR}/celery_io.pid" "${DJANGO_APP_DIR}/celery_llm.pid" 2>/dev/null
     
     # Wait to ensure sockets and resources are freed
     sleep 2
     
-    log_message "Starting new Celery worker (single process)..."
+    log_message "Starting I/O Celery worker (prefork, concurrency $CELERY_IO_CONCURRENCY)..."
+    start_celery_worker io io \
+        --pool=prefork \
+        --concurrency="$CELERY_IO_CONCURRENCY" \
+        --max-tasks-per-child=1000 || return 1
+    
+    log_message "Starting LLM Celery worker (prefork, concurrency $CELERY_LLM_CONCURRENCY)..."
+    # Fetch one task at a time so a queued generation can go to whichever process frees up first
+    start_celery_worker llm llm \
+        --pool=prefork \
+        --concurrency="$CELERY_LLM_CONCURRENCY" \
+        --prefetch-multiplier=1 \
+        --max-tasks-per-child=100 \
+        --max-memory-per-child="$CELERY_LLM_MAX_MEMORY_KB" || return 1
+    
+    WORKER_COUNT=$(pgrep -f "celery.*worker" | wc -l)
+    log_message "Total worker processes: $WORKER_COUNT"
+    
+    # Each worker is a parent plus one child per slot
+    EXPECTED_COUNT=$((CELERY_IO_CONCURRENCY + CELERY_LLM_CONCURRENCY + 2))
+    if [ "$WORKER_COUNT" -gt "$EXPECTED_COUNT" ]; then
+        log_message "WARNING: More worker processes than expected ($EXPECTED_COUNT). This might use unnecessary memory."
+    fi
+    return 0
+}
+
+# Function to start one Celery worker consuming a single queue
+# Usage: start_celery_worker NAME QUEUE [celery worker options...]
+start_celery_worker() {
+    local NAME=$1
+    local QUEUE=$2
+    shift 2
     
-    # Start with explicit options to prevent multiple workers
     celery -A "$(basename "$DJANGO_APP_DIR").celery" worker \
-        --concurrency=1 \
-        --max-tasks-per-child=100 \
+        --queues="$QUEUE" \
+        --hostname="${NAME}@%h" \
         --loglevel=info \
         --without-gossip \
         --without-mingle \
-        --pidfile="${DJANGO_APP_DIR}/celery.pid" \
-        > "$LOG_DIR/celery_worker.log" 2>&1 &
+        --pidfile="${DJANGO_APP_DIR}/celery_${NAME}.pid" \
+        "$@" \
+        > "$LOG_DIR/celery_${NAME}.log" 2>&1 &
     
-    WORKER_PID=$!
+    local WORKER_PID=$!
     sleep 5
     
     # Verify worker started successfully
-    if ps -p $WORKER_PID > /dev/null && pgrep -f "celery.*worker" > /dev/null; then
-        log_message "Celery worker started successfully with PID: $WORKER_PID"
-        log_message "Verifying worker count..."
-        WORKER_COUNT=$(pgrep -f "celery.*worker" | wc -l)
-        log_message "Total worker processes: $WORKER_COUNT"
-        
-        if [ "$WORKER_COUNT" -gt 2 ]; then
-            log_message "WARNING: More worker processes than expected. This might use unnecessary memory."
-        fi
+    if ps -p $WORKER_PID > /dev/null; then
+        log_message "Celery $NAME worker started successfully with PID: $WORKER_PID"
     else
-        log_message "ERROR: Celery worker failed to start."
+        log_message "ERROR: Celery $NAME worker failed to start."
+        tail -n 20 "$LOG_DIR/celery_${NAME}.log" | tee -a "$LOG_DIR/services.log"
         return 1
     fi
     return 0
@@ -379,7 +410,7 @@ restart_django_and_celery() {
     log_message "========================================="
     log_message "Services restarted, checking running processes:"
     log_message "Django logs: $LOG_DIR/django.log"
-    log_message "Celery worker logs: $LOG_DIR/celery_worker.log"
+    log_message "Celery worker logs: $LOG_DIR/celery_io.log, $LOG_DIR/celery_llm.log"
     log_message "Celery beat logs: $LOG_DIR/celery_beat.log"
     log_message "========================================="
 